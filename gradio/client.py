@@ -0,0 +1,163 @@
+"""
+Defines a client for calling a running gradio interface from Python. The client reads the interface's `/config/` to
+learn its input and output components, encodes Python values into the format each component expects over the wire,
+and sends requests through a pooled keep-alive session, with several requests in flight at once for batches.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+import base64
+import os
+import numpy as np
+import pandas as pd
+import PIL.Image
+import requests
+import scipy.io.wavfile
+from requests.adapters import HTTPAdapter
+from gradio import processing_utils
+
+IMAGE_COMPONENTS = ("image", "sketchpad", "webcam")
+AUDIO_COMPONENTS = ("audio", "microphone")
+
+
+def encode_audio_array_to_base64(sample_rate, data):
+    with BytesIO() as output_bytes:
+        scipy.io.wavfile.write(output_bytes, sample_rate, data)
+        bytes_data = output_bytes.getvalue()
+    return "data:audio/wav;base64," + str(base64.b64encode(bytes_data), 'utf-8')
+
+
+def encode_input(component, x):
+    """
+    Encodes a Python value into the format the input component with the given config name expects.
+    Parameters:
+    component (str): name of the input component, as listed in the interface config (e.g. "image", "textbox").
+    x (Any): for image components, a file path, PIL image, or numpy array; for audio components, a file path or a (sample_rate, data) tuple; for "file", a file path or bytes; for "dataframe", a pandas DataFrame, numpy array or list; otherwise the value itself. Values that are already base64 data urls are passed through.
+    """
+    if isinstance(x, str) and x.startswith("data:"):
+        return x
+    if component in IMAGE_COMPONENTS:
+        if isinstance(x, str):
+            return processing_utils.encode_file_to_base64(x)
+        if isinstance(x, PIL.Image.Image):
+            x = np.array(x)
+        return processing_utils.encode_array_to_base64(x)
+    elif component in AUDIO_COMPONENTS:
+        if isinstance(x, str):
+            return processing_utils.encode_file_to_base64(x, type="audio")
+        sample_rate, data = x
+        return encode_audio_array_to_base64(sample_rate, data)
+    elif component == "file":
+        if isinstance(x, str):
+            name, data = os.path.basename(x), processing_utils.encode_file_to_base64(x, type="application")
+        else:
+            name, data = "file", "data:application/octet-stream;base64," + str(base64.b64encode(x), 'utf-8')
+        return {"name": name, "data": data, "is_local_example": False}
+    elif component == "dataframe":
+        if isinstance(x, pd.DataFrame):
+            x = x.values
+        if isinstance(x, np.ndarray):
+            x = x.tolist()
+        return [row if isinstance(row, list) else [row] for row in x]
+    elif isinstance(x, np.generic):
+        return x.item()
+    return x
+
+
+def decode_output(component, y):
+    """
+    Decodes the wire format of the output component with the given config name back into a Python value: a PIL image
+    for "image", a (sample_rate, data) tuple for "audio", a label or a dictionary of confidences for "label", a
+    pandas DataFrame (or list) for "dataframe", and a (name, bytes) tuple for "file".
+    """
+    if component == "image":
+        return processing_utils.decode_base64_to_image(y)
+    elif component == "audio":
+        return scipy.io.wavfile.read(BytesIO(processing_utils.decode_base64_to_binary(y)))
+    elif component == "label":
+        if "confidences" in y:
+            return {c["label"]: c["confidence"] for c in y["confidences"]}
+        return y["label"]
+    elif component == "dataframe":
+        if "headers" in y:
+            return pd.DataFrame(y["data"], columns=y["headers"])
+        return y["data"]
+    elif component == "file":
+        return y["name"], base64.b64decode(y["data"])
+    return y
+
+
+class Client:
+    """
+    A client for a running gradio interface. Can be used as a context manager to close its connections when done.
+    """
+
+    def __init__(self, url, max_in_flight=8, decode_outputs=True, timeout=None):
+        """
+        Parameters:
+        url (str): local or share url of the running interface, e.g. "http://127.0.0.1:7860/".
+        max_in_flight (int): maximum number of requests sent concurrently, which is also the size of the connection pool.
+        decode_outputs (bool): if True, outputs are decoded into Python values (see `decode_output`); otherwise the raw JSON values are returned.
+        timeout (float): seconds to wait for each response; None waits indefinitely.
+        """
+        self.url = url.rstrip("/") + "/"
+        self.decode_outputs = decode_outputs
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_in_flight)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max_in_flight)
+        self.config = self.request("GET", "config/")
+        self.input_components = [iface[0] for iface in self.config["input_interfaces"]]
+        self.output_components = [iface[0] for iface in self.config["output_interfaces"]]
+
+    def request(self, method, route, data=None):
+        response = self.session.request(
+            method, self.url + route, json=None if data is None else {"data": data}, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def predict(self, *inputs):
+        """
+        Runs the interface on one set of inputs, one per input component.
+        Returns:
+        (Union[Any, List[Any]]): the output, or a list with one output per output component if there are several.
+        """
+        if len(inputs) != len(self.input_components):
+            raise ValueError("Expected {} inputs, got {}.".format(len(self.input_components), len(inputs)))
+        data = [encode_input(component, x) for component, x in zip(self.input_components, inputs)]
+        outputs = self.request("POST", "api/predict/", data)["data"]
+        if self.decode_outputs:
+            outputs = [decode_output(component, y) for component, y in zip(self.output_components, outputs)]
+        return outputs[0] if len(outputs) == 1 else outputs
+
+    def submit(self, *inputs):
+        """
+        Same as `predict`, but returns immediately with a `concurrent.futures.Future` for the result.
+        """
+        return self.executor.submit(self.predict, *inputs)
+
+    def predict_batch(self, batch):
+        """
+        Runs the interface on many sets of inputs, keeping up to `max_in_flight` requests in flight over the pooled
+        connections.
+        Parameters:
+        batch (List[Any]): list of input sets, one value per input component; for interfaces with a single input component, simply a list of inputs.
+        Returns:
+        (List[Any]): the result of `predict` for each input set, in order.
+        """
+        if len(self.input_components) == 1:
+            batch = [[x] for x in batch]
+        futures = [self.submit(*inputs) for inputs in batch]
+        return [future.result() for future in futures]
+
+    def close(self):
+        self.executor.shutdown()
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
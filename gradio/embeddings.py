@@ -1,7 +1,10 @@
+import math
 import numpy as np
+from sklearn.cluster import MiniBatchKMeans
 from sklearn.decomposition import PCA
 
 SMALL_CONST = 1e-10
+RANDOMIZED_PCA_MIN_EMBEDDINGS = 1000
 
 def calculate_similarity(embedding1, embedding2):
     """
@@ -11,18 +14,121 @@ def calculate_similarity(embedding1, embedding2):
     cosine_similarity = np.dot(e1, e2) / (np.linalg.norm(e1) * np.linalg.norm(e2) + SMALL_CONST)
     return cosine_similarity
 
+class EmbeddingIndex:
+    """
+    Stores a set of embeddings as a contiguous float32 matrix with unit-norm rows, so that the cosine similarity of a
+    query to every embedding is a single matrix-vector product.
+    """
+    def __init__(self, embeddings):
+        self.embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(self.embeddings, axis=1, keepdims=True)
+        self.normalized_embeddings = np.ascontiguousarray(self.embeddings / (norms + SMALL_CONST))
+
+    def __len__(self):
+        return len(self.embeddings)
+
+    def similarity(self, embedding):
+        """
+        Returns the cosine similarity of `embedding` to each embedding in the index, in index order.
+        """
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) + SMALL_CONST)
+        return self.normalized_embeddings @ query
+
+    def top_k(self, embedding, k):
+        """
+        Returns the indices and similarities of the `k` embeddings most similar to `embedding`, most similar first.
+        """
+        scores = self.similarity(embedding)
+        k = min(k, len(scores))
+        indices = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+        indices = indices[np.argsort(-scores[indices], kind="stable")]
+        return indices, scores[indices]
+
+
+class IVFIndex(EmbeddingIndex):
+    """
+    An approximate nearest-neighbor index for large sets of embeddings. The normalized embeddings are clustered with
+    k-means into `n_lists` inverted lists, stored contiguously list by list; a query is only compared to the embeddings
+    in the `n_probe` lists whose centroids are most similar to it.
+    """
+    def __init__(self, embeddings, n_lists=None, n_probe=None, centroids=None, assignments=None):
+        """
+        Parameters:
+        embeddings (numpy.ndarray): 2D array with one embedding per row.
+        n_lists (int): number of clusters; defaults to the square root of the number of embeddings.
+        n_probe (int): number of clusters searched per query; defaults to a tenth of the clusters (at least 1).
+        centroids (numpy.ndarray): centroids of a previously fitted index, used instead of fitting new ones.
+        assignments (numpy.ndarray): cluster of each embedding in a previously fitted index.
+        """
+        super().__init__(embeddings)
+        if centroids is None:
+            n_lists = n_lists or max(1, int(math.sqrt(len(self))))
+            kmeans = MiniBatchKMeans(n_clusters=n_lists, random_state=0, n_init=3)
+            assignments = kmeans.fit_predict(self.normalized_embeddings)
+            centroids = kmeans.cluster_centers_
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.assignments = np.asarray(assignments, dtype=np.int64)
+        self.n_probe = n_probe or max(1, len(self.centroids) // 10)
+        self.list_order = np.argsort(self.assignments, kind="stable")
+        self.list_offsets = np.searchsorted(self.assignments[self.list_order], np.arange(len(self.centroids) + 1))
+        self.list_embeddings = np.ascontiguousarray(self.normalized_embeddings[self.list_order])
+
+    def top_k(self, embedding, k):
+        """
+        Returns the indices and similarities of approximately the `k` embeddings most similar to `embedding`. The
+        embeddings in the `n_probe` lists nearest to the query are ranked together, most similar first; if they are
+        fewer than `k`, the next lists are searched one at a time and each is ranked after the previous ones. So the
+        result for a larger `k` always starts with the result for a smaller one, and pages of results do not overlap.
+        """
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) + SMALL_CONST)
+        k = min(k, len(self))
+        list_ids = np.argsort(-(self.centroids @ query), kind="stable")
+        groups = [list_ids[:self.n_probe]] + [list_ids[i:i + 1] for i in range(self.n_probe, len(list_ids))]
+        candidates, scores, n_found = [], [], 0
+        for group in groups:
+            if n_found >= k:
+                break
+            ranges = [(self.list_offsets[list_id], self.list_offsets[list_id + 1]) for list_id in group]
+            group_candidates = np.concatenate([self.list_order[start:end] for start, end in ranges])
+            group_scores = np.concatenate([self.list_embeddings[start:end] @ query for start, end in ranges])
+            best = np.argsort(-group_scores, kind="stable")[:k - n_found]
+            candidates.append(group_candidates[best])
+            scores.append(group_scores[best])
+            n_found += len(best)
+        return np.concatenate(candidates), np.concatenate(scores)
+
+    def save(self, path):
+        np.savez(path, embeddings=self.embeddings, centroids=self.centroids, assignments=self.assignments)
+
+    @classmethod
+    def load(cls, path, n_probe=None):
+        with np.load(path) as data:
+            return cls(data["embeddings"], n_probe=n_probe, centroids=data["centroids"],
+                       assignments=data["assignments"])
+
+
+def embeddings_2d_to_points(embeddings_2D):
+    if embeddings_2D.shape[1] < 2:  # Fewer components could be fit than requested; the rest are 0.
+        embeddings_2D = np.pad(embeddings_2D, ((0, 0), (0, 2 - embeddings_2D.shape[1])))
+    return [{'x': e[0], 'y': e[1]} for e in embeddings_2D.tolist()]
+
 def fit_pca_to_embeddings(embeddings):
     """
-    Computes 2D tsne embeddings from a list of higher-dimensional embeddings
+    Computes 2D PCA embeddings from a list of higher-dimensional embeddings. Large sets of embeddings are fit with
+    randomized SVD, which is much faster than a full SVD when only 2 components are needed.
     """
-    pca_model = PCA(n_components=2, random_state=0)
-    embeddings = np.array(embeddings)
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    n_components = min(2, *embeddings.shape)
+    svd_solver = "randomized" if len(embeddings) >= RANDOMIZED_PCA_MIN_EMBEDDINGS else "full"
+    pca_model = PCA(n_components=n_components, svd_solver=svd_solver, random_state=0)
     embeddings_2D = pca_model.fit_transform(embeddings)
-    return pca_model, [{'x': e[0], 'y': e[1]} for e in embeddings_2D.tolist()]
+    return pca_model, embeddings_2d_to_points(embeddings_2D)
 
 def transform_with_pca(pca_model, embeddings):
     """
-    Computes 2D tsne embeddings from a list of higher-dimensional embeddings
+    Computes 2D PCA embeddings from a list of higher-dimensional embeddings, using a fitted model
     """
-    embeddings_2D = pca_model.transform(embeddings)
-    return [{'x': e[0], 'y': e[1]} for e in embeddings_2D.tolist()]
+    embeddings_2D = pca_model.transform(np.asarray(embeddings, dtype=np.float32))
+    return embeddings_2d_to_points(embeddings_2D)
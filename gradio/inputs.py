@@ -4,13 +4,14 @@ This module defines various classes that can serve as the `input` to an interfac
 automatically added to a registry, which allows them to be easily referenced in other parts of the code.
 """
 
-import datetime
+import collections
+import hashlib
 import json
 import os
+import threading
 import time
 import warnings
 from gradio.component import Component
-import base64
 import numpy as np
 import PIL
 from skimage.segmentation import slic
@@ -21,6 +22,8 @@ import math
 import tempfile
 from pandas.api.types import is_bool_dtype, is_numeric_dtype, is_string_dtype
 
+SEGMENTATION_CACHE_SIZE = 32  # Segmentations of this many recently interpreted images are kept per Image component.
+
 
 class InputComponent(Component):
     """
@@ -48,6 +51,14 @@ class InputComponent(Component):
         '''
         return self
 
+    def preprocess_neighbor(self, x):
+        """
+        Preprocesses a value returned by `get_interpretation_neighbors`. Neighbors are raw inputs by default, so this
+        is the same as `preprocess`; components that generate neighbors in an already-decoded form override it to skip
+        the encoding and decoding.
+        """
+        return self.preprocess(x)
+
     def get_interpretation_neighbors(self, x):
         '''
         Generates values similar to input to be used to interpret the significance of the input in the final output.
@@ -60,6 +71,42 @@ class InputComponent(Component):
         '''
         pass
 
+    def interpret_adaptively(self, x, evaluate):
+        '''
+        Components whose neighbors depend on the scores of earlier neighbors (e.g. to refine only the parts of the input that matter) override this instead of relying on `get_interpretation_neighbors` alone.
+        Parameters:
+        x (Any): Input to interface
+        evaluate (Callable[[List[Any]], List[float]]): computes the output value of each of a list of neighbors, in one batch.
+        Returns: (neighbor_values, scores, interpret_kwargs, interpret_by_removal), or None to use `get_interpretation_neighbors`.
+        neighbor_values (List[Any]): Neighbors, each previously passed to evaluate, to pass to get_interpretation_scores
+        scores (List[float]): Output value corresponding to each neighbor in neighbor_values
+        interpret_kwargs (Dict[Any]): Keyword arguments to be passed to get_interpretation_scores
+        interpret_by_removal (bool): Same as in get_interpretation_neighbors.
+        '''
+        return None
+
+    def get_interpretation_features(self, x):
+        '''
+        Splits the input into features that can be removed in any combination, for "shapley" interpretation.
+        Parameters:
+        x (Any): Input to interface
+        Returns: (num_features, state, interpret_kwargs), or None if the component only supports removing one part of the input at a time.
+        num_features (int): Number of features
+        state (Any): Whatever get_coalition_neighbor needs to build neighbors
+        interpret_kwargs (Dict[Any]): Keyword arguments to be passed to get_interpretation_scores
+        '''
+        return None
+
+    def get_coalition_neighbor(self, state, coalition):
+        '''
+        Parameters:
+        state (Any): As returned by get_interpretation_features
+        coalition (numpy.array): Boolean array with one value per feature, True for the features that are kept
+        Returns:
+        (Any): Neighbor with the features outside the coalition removed. The neighbor with only feature i removed is passed to get_interpretation_scores as the neighbor of feature i.
+        '''
+        pass
+
     def get_interpretation_scores(self, x, neighbors, scores, **kwargs):
         '''
         Arrange the output values from the neighbors into interpretation scores for the interface to render.
@@ -145,28 +192,104 @@ class Textbox(InputComponent):
         """
         return x
 
-    def interpret(self, separator=" ", replacement=None):
+    def interpret(self, separator=" ", replacement=None, mode="token", max_calls=None):
         """
         Calculates interpretation score of characters in input by splitting input into tokens, then using a "leave one out" method to calculate the score of each token by removing each token and measuring the delta of the output value.
         Parameters:
         separator (str): Separator to use to split input into tokens.
         replacement (str): In the "leave one out" step, the text that the token should be replaced with.
+        mode (str): "token" removes each token in turn. Ignored by "shapley" interpretation, whose features are tokens. "hierarchical" first removes each sentence, then splits the spans that changed the output most into phrases, then tokens, while `max_calls` allows; tokens in a span that was not split share its score equally.
+        max_calls (int): in "hierarchical" mode, the maximum number of model calls; None refines every span that changed the output down to single tokens.
         """
         self.interpretation_separator = separator
         self.interpretation_replacement = replacement
+        self.interpretation_mode = mode
+        self.interpretation_max_calls = max_calls
         return self
-    
+
+    def get_leave_one_out_string(self, tokens, start, stop):
+        """
+        Returns the text with the tokens in [start, stop) removed, or each replaced with the replacement text.
+        """
+        if self.interpretation_replacement is None:
+            leave_one_out_set = tokens[:start] + tokens[stop:]
+        else:
+            leave_one_out_set = tokens[:start] + [self.interpretation_replacement] * (stop - start) + tokens[stop:]
+        return self.interpretation_separator.join(leave_one_out_set)
+
     def get_interpretation_neighbors(self, x):
         tokens = x.split(self.interpretation_separator)
         leave_one_out_strings = []
         for index in range(len(tokens)):
-            leave_one_out_set = list(tokens)
-            if self.interpretation_replacement is None:
-                leave_one_out_set.pop(index)
-            else:
-                leave_one_out_set[index] = self.interpretation_replacement
-            leave_one_out_strings.append(self.interpretation_separator.join(leave_one_out_set))
+            leave_one_out_strings.append(self.get_leave_one_out_string(tokens, index, index + 1))
         return leave_one_out_strings, {"tokens": tokens}, True
+
+    @staticmethod
+    def split_span(tokens, start, stop):
+        """
+        Splits the tokens in [start, stop) into sentences or, if there is only one, phrases; long spans without
+        punctuation are halved, and short ones split into tokens.
+        """
+        for boundary_characters in (".!?", ",;:"):
+            spans, span_start = [], start
+            for index in range(start, stop - 1):
+                if tokens[index].endswith(tuple(boundary_characters)):
+                    spans.append((span_start, index + 1))
+                    span_start = index + 1
+            if spans:
+                return spans + [(span_start, stop)]
+        if stop - start > 4:
+            middle = (start + stop) // 2
+            return [(start, middle), (middle, stop)]
+        return [(index, index + 1) for index in range(start, stop)]
+
+    def interpret_adaptively(self, x, evaluate):
+        if self.interpretation_mode == "token":
+            return None
+        elif self.interpretation_mode != "hierarchical":
+            raise ValueError("Unknown interpretation mode: " + str(self.interpretation_mode) +
+                             ". Please choose from: 'token', 'hierarchical'.")
+        tokens = x.split(self.interpretation_separator)
+        max_calls = self.interpretation_max_calls
+        spans = self.split_span(tokens, 0, len(tokens))
+        if max_calls is not None and len(spans) > max_calls:  # Merge neighboring spans to fit the budget.
+            boundaries = np.linspace(0, len(spans), max_calls + 1).round().astype(int)
+            spans = [(spans[first][0], spans[last - 1][1]) for first, last in zip(boundaries[:-1], boundaries[1:])]
+        neighbors = [self.get_leave_one_out_string(tokens, start, stop) for start, stop in spans]
+        leaves = dict(zip(spans, zip(neighbors, evaluate(neighbors))))  # The finest spans evaluated so far.
+        calls = len(spans)
+        while True:
+            children = []
+            for span in sorted(leaves, key=lambda span: -abs(leaves[span][1])):
+                start, stop = span
+                if stop - start == 1 or leaves[span][1] == 0:
+                    continue
+                span_children = self.split_span(tokens, start, stop)
+                if max_calls is not None and calls + len(span_children) > max_calls:
+                    continue
+                calls += len(span_children)
+                del leaves[span]
+                children.extend(span_children)
+            if not children:
+                break
+            neighbors = [self.get_leave_one_out_string(tokens, start, stop) for start, stop in children]
+            leaves.update(zip(children, zip(neighbors, evaluate(neighbors))))
+        token_neighbors, token_scores = [], []
+        for (start, stop), (neighbor, score) in sorted(leaves.items()):
+            token_neighbors.extend([neighbor] * (stop - start))
+            token_scores.extend([score / (stop - start)] * (stop - start))
+        return token_neighbors, token_scores, {"tokens": tokens}, True
+
+    def get_interpretation_features(self, x):
+        tokens = x.split(self.interpretation_separator)
+        return len(tokens), tokens, {"tokens": tokens}
+
+    def get_coalition_neighbor(self, tokens, coalition):
+        if self.interpretation_replacement is None:
+            kept_tokens = [token for token, kept in zip(tokens, coalition) if kept]
+        else:
+            kept_tokens = [token if kept else self.interpretation_replacement for token, kept in zip(tokens, coalition)]
+        return self.interpretation_separator.join(kept_tokens)
     
     def get_interpretation_scores(self, x, neighbors, scores, tokens):
         """
@@ -179,6 +302,7 @@ class Textbox(InputComponent):
             result.append((self.interpretation_separator, 0))
         return result
 
+    @staticmethod
     def _embed_text(text):
         """
         Figures out a "reasonable" embedding for any particular text. Did it this way to avoid loading any 
@@ -193,7 +317,7 @@ class Textbox(InputComponent):
         Embeds an arbitrary text based on word frequency
         """
         if self.type == "str":
-            return _embed_text(x)
+            return self._embed_text(x)
         elif self.type == "number":
             return [float(x)]
         else:
@@ -611,6 +735,8 @@ class Image(InputComponent):
         self.type = type
         self.invert_colors = invert_colors
         self.test_input = test_data.BASE64_IMAGE
+        self.segmentation_cache = collections.OrderedDict()  # Maps a hash of an image to its segment labels.
+        self.segmentation_cache_lock = threading.Lock()
         super().__init__(label)
 
     @classmethod
@@ -631,12 +757,17 @@ class Image(InputComponent):
         }
 
     def preprocess(self, x):
-        im = processing_utils.decode_base64_to_image(x)
-        fmt = im.format
+        im = processing_utils.decode_base64_to_image(x, target_size=self.shape)
+        return self.preprocess_image(im, im.format)
+
+    def preprocess_image(self, im, fmt):
+        """
+        Applies the preprocessing that follows decoding to a PIL image, and converts it to the component's type.
+        """
         with warnings.catch_warnings():
             warnings.simplefilter("ignore")
             im = im.convert(self.image_mode)
-        if self.shape is not None:
+        if self.shape is not None and im.size != tuple(self.shape):
             im = processing_utils.resize_and_crop(im, self.shape)
         if self.invert_colors:
             im = PIL.ImageOps.invert(im)
@@ -656,46 +787,114 @@ class Image(InputComponent):
 
     def rebuild(self, dir, data):
         """
-        Default rebuild method to decode a base64 image
+        Default rebuild method to store a base64 image, deduplicated by its contents
         """
-        im = processing_utils.decode_base64_to_image(data)
-        timestamp = datetime.datetime.now()
-        filename = f'input_{timestamp.strftime("%Y-%m-%d-%H-%M-%S")}.png'
-        im.save(f'{dir}/{filename}', 'PNG')
-        return filename
+        return processing_utils.save_base64_to_flagged_file(dir, data)
 
-    def interpret(self, segments=16):
+    def interpret(self, segments=16, segmenter="slic", segmentation_size=64):
         """
         Calculates interpretation score of image subsections by splitting the image into subsections, then using a "leave one out" method to calculate the score of each subsection by whiting out the subsection and measuring the delta of the output value.
         Parameters:
         segments (int): Number of interpretation segments to split image into.
+        segmenter (str): "slic" splits the image into superpixels of similar color, "grid" into a grid of rectangles, which is faster but ignores the contents of the image.
+        segmentation_size (int): "slic" segments a copy of the image downsampled so that its larger side is at most this many pixels, and the segments are scaled back up, so segmentation takes about as long for any image size.
         """
         self.interpretation_segments = segments
+        self.interpretation_segmenter = segmenter
+        self.interpretation_segmentation_size = segmentation_size
         return self
 
-    def get_interpretation_neighbors(self, x):
-        x = processing_utils.decode_base64_to_image(x)
+    def preprocess_neighbor(self, x):
+        """
+        Neighbors are numpy arrays of the decoded, resized image, so they skip decoding.
+        """
+        return self.preprocess_image(PIL.Image.fromarray(x), "png")
+
+    def segment_image(self, image):
+        """
+        Parameters:
+        image (numpy.array): the decoded, resized image.
+        Returns:
+        (numpy.array): the segment label of each pixel of the image. Segmentations are cached by the contents of the image and the segmentation settings.
+        """
+        height, width = image.shape[:2]
+        key = hashlib.sha1(np.ascontiguousarray(image))
+        key.update(json.dumps([image.shape, str(image.dtype), self.interpretation_segmenter,
+                               self.interpretation_segments, self.interpretation_segmentation_size]).encode("utf-8"))
+        key = key.hexdigest()
+        with self.segmentation_cache_lock:
+            if key in self.segmentation_cache:
+                self.segmentation_cache.move_to_end(key)
+                return self.segmentation_cache[key]
+        if self.interpretation_segmenter == "grid":
+            rows = max(1, round(math.sqrt(self.interpretation_segments * height / width)))
+            columns = max(1, math.ceil(self.interpretation_segments / rows))
+            labels = (np.arange(height)[:, np.newaxis] * rows // height) * columns + \
+                     np.arange(width)[np.newaxis, :] * columns // width
+        elif self.interpretation_segmenter == "slic":
+            scale = min(1, self.interpretation_segmentation_size / max(width, height))
+            small_im = PIL.Image.fromarray(image).convert("RGB")
+            if scale < 1:
+                small_im = small_im.resize((max(1, round(width * scale)), max(1, round(height * scale))),
+                                           PIL.Image.BILINEAR)
+            small_labels = slic(np.array(small_im), self.interpretation_segments, compactness=10, sigma=1)
+            small_height, small_width = small_labels.shape
+            labels = small_labels[(np.arange(height) * small_height // height)[:, np.newaxis],
+                                  (np.arange(width) * small_width // width)[np.newaxis, :]]
+        else:
+            raise ValueError("Unknown segmenter: " + str(self.interpretation_segmenter) +
+                             ". Please choose from: 'slic', 'grid'.")
+        with self.segmentation_cache_lock:
+            self.segmentation_cache[key] = labels
+            while len(self.segmentation_cache) > SEGMENTATION_CACHE_SIZE:
+                self.segmentation_cache.popitem(last=False)
+        return labels
+
+    def get_interpretation_segments(self, x):
+        """
+        Returns:
+        image (numpy.array): the decoded, resized image.
+        masks (List[numpy.array]): a boolean mask of the pixels in each segment.
+        replace_color (numpy.array): the color removed segments are filled with.
+        """
+        x = processing_utils.decode_base64_to_image(x, target_size=self.shape)
         if self.shape is not None:
             x = processing_utils.resize_and_crop(x, self.shape)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            x = x.convert(self.image_mode)
         image = np.array(x)
-        segments_slic = slic(image, self.interpretation_segments, compactness=10, sigma=1)
-        leave_one_out_tokens, masks = [], []
-        replace_color = np.mean(image, axis=(0, 1))
-        for (i, segVal) in enumerate(np.unique(segments_slic)):
-            mask = segments_slic == segVal
+        segment_labels = self.segment_image(image)
+        masks = [segment_labels == segVal for segVal in np.unique(segment_labels)]
+        return image, masks, np.mean(image, axis=(0, 1))
+
+    def get_interpretation_neighbors(self, x):
+        image, masks, replace_color = self.get_interpretation_segments(x)
+        leave_one_out_tokens = []
+        for mask in masks:
             white_screen = np.copy(image)
-            white_screen[segments_slic == segVal] = replace_color
-            leave_one_out_tokens.append(
-                processing_utils.encode_array_to_base64(white_screen))
-            masks.append(mask)
+            white_screen[mask] = replace_color
+            leave_one_out_tokens.append(white_screen)
         return leave_one_out_tokens, {"masks": masks}, True
 
+    def get_interpretation_features(self, x):
+        image, masks, replace_color = self.get_interpretation_segments(x)
+        return len(masks), (image, masks, replace_color), {"masks": masks}
+
+    def get_coalition_neighbor(self, state, coalition):
+        image, masks, replace_color = state
+        white_screen = np.copy(image)
+        for mask, kept in zip(masks, coalition):
+            if not kept:
+                white_screen[mask] = replace_color
+        return white_screen
+
     def get_interpretation_scores(self, x, neighbors, scores, masks):
         """
         Returns:
         (List[List[float]]): A 2D array representing the interpretation score of each pixel of the image.
         """
-        x = processing_utils.decode_base64_to_image(x)
+        x = processing_utils.decode_base64_to_image(x, target_size=self.shape)
         if self.shape is not None:
             x = processing_utils.resize_and_crop(x, self.shape)
         x = np.array(x)
@@ -757,17 +956,33 @@ class Audio(InputComponent):
         """
         By default, no pre-processing is applied to a microphone input file
         """
-        file_obj = processing_utils.decode_base64_to_file(x)
         if self.type == "file":
+            return processing_utils.decode_base64_to_file(x)
+        return self.preprocess_wav(*processing_utils.decode_base64_to_wav(x))
+
+    def preprocess_wav(self, sample_rate, data):
+        """
+        Converts decoded audio to the component's type.
+        """
+        if self.type == "file":
+            file_obj = tempfile.NamedTemporaryFile(suffix=".wav")
+            scipy.io.wavfile.write(file_obj, sample_rate, data)
+            file_obj.flush()
             return file_obj
         elif self.type == "numpy":
-            return scipy.io.wavfile.read(file_obj.name)
+            return sample_rate, data
         elif self.type == "mfcc":
-            return processing_utils.generate_mfcc_features_from_audio_file(file_obj.name)
+            return processing_utils.generate_mfcc_features_from_audio_file(sample_rate=sample_rate, signal=data)
 
     def preprocess_example(self, x):
         return processing_utils.encode_file_to_base64(x, type="audio")
 
+    def rebuild(self, dir, data):
+        """
+        Default rebuild method to store a base64 audio file, deduplicated by its contents
+        """
+        return processing_utils.save_base64_to_flagged_file(dir, data)
+
     def interpret(self, segments=8):
         """
         Calculates interpretation score of audio subsections by splitting the audio into subsections, then using a "leave one out" method to calculate the score of each subsection by removing the subsection and measuring the delta of the output value.
@@ -777,24 +992,43 @@ class Audio(InputComponent):
         self.interpretation_segments = segments
         return self
     
-    def get_interpretation_neighbors(self, x):
-        file_obj = processing_utils.decode_base64_to_file(x)
-        x = scipy.io.wavfile.read(file_obj.name)
-        sample_rate, data = x
-        leave_one_out_sets = []
+    def preprocess_neighbor(self, x):
+        """
+        Neighbors are (sample_rate, data, ranges) tuples sharing the decoded audio; the audio with the samples in each
+        [start, stop) range zeroed is only materialized here, one neighbor at a time.
+        """
+        sample_rate, data, ranges = x
+        leave_one_out_data = np.copy(data)
+        for start, stop in ranges:
+            leave_one_out_data[start:stop] = 0
+        return self.preprocess_wav(sample_rate, leave_one_out_data)
+
+    def get_interpretation_segments(self, x):
+        """
+        Returns:
+        sample_rate (int): sample rate of the decoded audio.
+        data (numpy.array): the decoded audio.
+        ranges (List[Tuple[int, int]]): the [start, stop) samples of each evenly spaced segment.
+        """
+        sample_rate, data = processing_utils.decode_base64_to_wav(x)
         duration = data.shape[0]
         boundaries = np.linspace(0, duration, self.interpretation_segments + 1).tolist()
         boundaries = [round(boundary) for boundary in boundaries]
-        for index in range(len(boundaries) - 1):
-            leave_one_out_data = np.copy(data)
-            start, stop = boundaries[index], boundaries[index + 1]
-            leave_one_out_data[start:stop] = 0
-            file = tempfile.NamedTemporaryFile()
-            scipy.io.wavfile.write(file, sample_rate, leave_one_out_data)                
-            out_data = processing_utils.encode_file_to_base64(file.name, type="audio", ext="wav")
-            leave_one_out_sets.append(out_data)
+        return sample_rate, data, list(zip(boundaries[:-1], boundaries[1:]))
+
+    def get_interpretation_neighbors(self, x):
+        sample_rate, data, ranges = self.get_interpretation_segments(x)
+        leave_one_out_sets = [(sample_rate, data, [segment]) for segment in ranges]
         return leave_one_out_sets, {}, True
 
+    def get_interpretation_features(self, x):
+        segments = self.get_interpretation_segments(x)
+        return len(segments[2]), segments, {}
+
+    def get_coalition_neighbor(self, state, coalition):
+        sample_rate, data, ranges = state
+        return sample_rate, data, [segment for segment, kept in zip(ranges, coalition) if not kept]
+
     def get_interpretation_scores(self, x, neighbors, scores):
         """
         Returns:
@@ -923,35 +1157,87 @@ class Dataframe(InputComponent):
         else:
             raise ValueError("Unknown type: " + str(self.type) + ". Please choose from: 'pandas', 'numpy', 'array'.")
 
-    def interpret(self):
+    def interpret(self, mode="cell", max_evaluations=None):
         """
         Calculates interpretation score of each cell in the Dataframe by using a "leave one out" method to calculate the score of each cell by removing the cell and measuring the delta of the output value.
+        Parameters:
+        mode (str): what to remove at a time. "cell" removes each cell, "row" each row and "column" each column; every cell in a row or column gets the score of the row or column.
+        max_evaluations (int): if provided and there are more cells, rows or columns than this, a fixed random sample of this many of them is scored, and the rest get a score of 0. Ignored by "shapley" interpretation, which is limited by the interface's `interpretation_budget` instead.
         """
+        self.interpretation_mode = mode
+        self.interpretation_max_evaluations = max_evaluations
         return self
 
-    def get_interpretation_neighbors(self, x):
+    def preprocess_neighbor(self, x):
+        """
+        Neighbors are (values, replacements, index) tuples sharing the table's values and the replacement value of
+        each cell; the table with the cells at `index` replaced is only materialized here, one neighbor at a time.
+        """
+        values, replacements, index = x
+        neighbor = values.copy()
+        neighbor[index] = replacements[index]
+        return self.preprocess(neighbor.tolist())
+
+    def get_interpretation_units(self, x):
+        """
+        Returns:
+        values (numpy.array): the table's values.
+        replacements (numpy.array): the value each cell is replaced with when it is removed.
+        indices (List[Tuple]): the index of each cell, row or column that is removed as a unit, depending on the mode.
+        """
         x = pd.DataFrame(x)
-        leave_one_out_sets = []
-        shape = x.shape
-        for i in range(shape[0]):
-            for j in range(shape[1]):
-                scalar = x.iloc[i, j]
-                leave_one_out_df = x.copy()
-                if is_bool_dtype(scalar):
-                    leave_one_out_df.iloc[i, j] = not scalar
-                elif is_numeric_dtype(scalar):
-                    leave_one_out_df.iloc[i, j] = 0
-                elif is_string_dtype(scalar):
-                    leave_one_out_df.iloc[i, j] = ""
-                leave_one_out_sets.append(leave_one_out_df.values.tolist())
-        return leave_one_out_sets, {"shape": x.shape}, True
+        values = x.values.astype(object)
+        replacements = np.empty(x.shape, dtype=object)
+        for j in range(x.shape[1]):
+            column = x.iloc[:, j]
+            if is_bool_dtype(column):
+                replacements[:, j] = ~column.values
+            elif is_numeric_dtype(column):
+                replacements[:, j] = 0
+            else:
+                replacements[:, j] = [not value if isinstance(value, bool) else
+                                      0 if isinstance(value, (int, float)) else "" for value in column]
+        if self.interpretation_mode == "cell":
+            indices = [(i, j) for i in range(x.shape[0]) for j in range(x.shape[1])]
+        elif self.interpretation_mode == "row":
+            indices = [(i, slice(None)) for i in range(x.shape[0])]
+        elif self.interpretation_mode == "column":
+            indices = [(slice(None), j) for j in range(x.shape[1])]
+        else:
+            raise ValueError("Unknown interpretation mode: " + str(self.interpretation_mode) +
+                             ". Please choose from: 'cell', 'row', 'column'.")
+        return values, replacements, indices
+
+    def get_interpretation_neighbors(self, x):
+        values, replacements, indices = self.get_interpretation_units(x)
+        max_evaluations = self.interpretation_max_evaluations
+        if max_evaluations is not None and len(indices) > max_evaluations:
+            sample = np.random.RandomState(0).choice(len(indices), max_evaluations, replace=False)
+            indices = [indices[k] for k in sorted(sample)]
+        leave_one_out_sets = [(values, replacements, index) for index in indices]
+        return leave_one_out_sets, {"shape": values.shape}, True
+
+    def get_interpretation_features(self, x):
+        values, replacements, indices = self.get_interpretation_units(x)
+        return len(indices), (values, replacements, indices), {"shape": values.shape}
+
+    def get_coalition_neighbor(self, state, coalition):
+        values, replacements, indices = state
+        removed = np.zeros(values.shape, dtype=bool)
+        for index, kept in zip(indices, coalition):
+            if not kept:
+                removed[index] = True
+        return values, replacements, removed
 
     def get_interpretation_scores(self, x, neighbors, scores, shape):
         """
         Returns:
         (List[List[float]]): A 2D array where each value corrseponds to the interpretation score of each cell.
         """
-        return np.array(scores).reshape((shape)).tolist()
+        output_scores = np.zeros(shape)
+        for (_, _, index), score in zip(neighbors, scores):
+            output_scores[index] = score
+        return output_scores.tolist()
 
     def embed(self, x):
         raise NotImplementedError("DataFrame doesn't currently support embeddings")
@@ -1008,13 +1294,9 @@ class Sketchpad(InputComponent):
 
     def rebuild(self, dir, data):
         """
-        Default rebuild method to decode a base64 image
+        Default rebuild method to store a base64 image, deduplicated by its contents
         """
-        im = processing_utils.decode_base64_to_image(data)
-        timestamp = datetime.datetime.now()
-        filename = f'input_{timestamp.strftime("%Y-%m-%d-%H-%M-%S")}.png'
-        im.save(f'{dir}/{filename}', 'PNG')
-        return filename
+        return processing_utils.save_base64_to_flagged_file(dir, data)
 
 
 class Webcam(InputComponent):
@@ -1047,13 +1329,9 @@ class Webcam(InputComponent):
 
     def rebuild(self, dir, data):
         """
-        Default rebuild method to decode a base64 image
+        Default rebuild method to store a base64 image, deduplicated by its contents
         """
-        im = processing_utils.decode_base64_to_image(data)
-        timestamp = datetime.datetime.now()
-        filename = f'input_{timestamp.strftime("%Y-%m-%d-%H-%M-%S")}.png'
-        im.save('{}/{}'.format(dir, filename), 'PNG')
-        return filename
+        return processing_utils.save_base64_to_flagged_file(dir, data)
 
 
 class Microphone(InputComponent):
@@ -1088,10 +1366,4 @@ class Microphone(InputComponent):
 
 
     def rebuild(self, dir, data):
-        inp = data.split(';')[1].split(',')[1]
-        wav_obj = base64.b64decode(inp)
-        timestamp = datetime.datetime.now()
-        filename = f'input_{timestamp.strftime("%Y-%m-%d-%H-%M-%S")}.wav'
-        with open("{}/{}".format(dir, filename), "wb+") as f:
-            f.write(wav_obj)
-        return filename
+        return processing_utils.save_base64_to_flagged_file(dir, data)
@@ -3,25 +3,138 @@ This is the core file in the `gradio` package, and defines the Interface class,
 interface using the input and output types.
 """
 
-from gradio.inputs import InputComponent
+from gradio.inputs import InputComponent, Textbox, Image, Audio, File
 from gradio.outputs import OutputComponent
 from gradio import networking, strings, utils
-from gradio.interpretation import quantify_difference_in_label
+from gradio.interpretation import quantify_difference_in_label, sample_coalitions, solve_shapley_values
+from gradio.embeddings import EmbeddingIndex, IVFIndex, fit_pca_to_embeddings, transform_with_pca
 import requests
 import random
 import time
+import uuid
 import webbrowser
 import inspect
 import sys
 import weakref
+import threading
 import analytics
 import numpy as np
+import PIL.Image
 import os
+import collections
+import contextlib
 import copy
+import csv
+import hashlib
+import json
+import pkg_resources
+import tempfile
+import warnings
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 analytics.write_key = "uxIFddIEuuUcFLf9VgH2teTEtPlWdkNy"
 analytics_url = 'https://api.gradio.app/'
 ip_address = networking.get_local_ip_address()
+CACHED_EXAMPLES_DIR = "gradio_cached_examples"
+ANN_INDEX_MIN_EXAMPLES = 10000  # Interfaces with at least this many examples use an approximate similarity index.
+INLINE_EXAMPLES_LIMIT = 100  # Interfaces with more examples send them to the browser a page at a time.
+ALTERNATIVE_OUTPUTS_TTL = 10 * 60  # Seconds that the alternative outputs of an interpretation can be fetched for.
+MAX_STORED_ALTERNATIVE_OUTPUTS = 100  # Interpretations whose alternative outputs are kept at once.
+MAX_STORED_ALTERNATIVE_OUTPUTS_BYTES = 256 * 1024 * 1024  # Approximate memory all stored alternative outputs may use.
+MAX_INTERPRETATION_CACHE_BYTES = 256 * 1024 * 1024  # Approximate memory the cached interpretations may use.
+
+
+def get_approximate_size(value):
+    """
+    Estimates the memory used by a prediction or interpretation: the data of numpy arrays, PIL images, strings and
+    bytes, summed over nested lists, tuples and dictionaries.
+    """
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, PIL.Image.Image):
+        return value.width * value.height * len(value.getbands())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(get_approximate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(get_approximate_size(key) + get_approximate_size(item)
+                                          for key, item in value.items())
+    return sys.getsizeof(value)
+
+
+def copy_shared_input(value, exit_stack):
+    """
+    Copies a preprocessed input that is passed to fn for several interpretation neighbors, so that a fn which
+    modifies its inputs in place does not change the input seen by other neighbors. File objects are reopened, so that
+    each neighbor reads the file from the start, and registered with `exit_stack`, which closes them once the
+    prediction is done.
+    """
+    if value is None or isinstance(value, (str, bytes, int, float, bool)):
+        return value
+    if isinstance(value, np.ndarray):
+        return np.copy(value)
+    if isinstance(value, PIL.Image.Image):
+        return value.copy()
+    if hasattr(value, "read") and isinstance(getattr(value, "name", None), str):
+        return exit_stack.enter_context(open(value.name, "rb" if "b" in getattr(value, "mode", "") else "r"))
+    try:
+        return copy.deepcopy(value)
+    except (copy.Error, TypeError):
+        return value
+
+
+def get_example_file_path(path):
+    """
+    Returns the path of an example file relative to the working directory, which the /file/ and /thumbnail/ routes
+    serve files from. Files outside of the working directory keep their absolute path, and cannot be shown in the
+    examples table.
+    """
+    relative_path = os.path.relpath(path)
+    if relative_path == os.pardir or relative_path.startswith(os.pardir + os.sep):
+        warnings.warn("Example file {} is outside of the working directory, so it cannot be shown in the browser."
+                      .format(path))
+        return os.path.abspath(path)
+    return relative_path
+
+
+def load_examples_from_path(path, input_interfaces):
+    """
+    Loads examples from a CSV file with a header row, whose first columns are the inputs (such as the log.csv written
+    by flagging), or from a directory, which either contains such a log.csv or, for interfaces with a single input,
+    has one example per file (subdirectories are skipped). File paths in a CSV file are relative to its directory,
+    and are only resolved for file inputs (Image, Audio and File); example file paths are returned relative to the
+    working directory.
+    Returns:
+    (List[List[Any]]): examples, one list of inputs per example.
+    """
+    if os.path.isdir(path):
+        if os.path.exists(os.path.join(path, "log.csv")):
+            path = os.path.join(path, "log.csv")
+        elif len(input_interfaces) == 1:
+            return [[get_example_file_path(os.path.join(path, filename))] for filename in sorted(os.listdir(path))
+                    if not filename.startswith(".") and os.path.isfile(os.path.join(path, filename))]
+        else:
+            raise ValueError("An examples directory for an interface with multiple inputs must contain a log.csv "
+                             "file.")
+    directory = os.path.dirname(path)
+    examples = []
+    with open(path, newline="") as csv_file:
+        reader = csv.reader(csv_file)
+        next(reader, None)  # Skip the header row
+        for row in reader:
+            example_set = []
+            for iface, value in zip(input_interfaces, row):
+                if isinstance(iface, (Image, Audio, File)):
+                    if value and os.path.isfile(os.path.join(directory, value)):
+                        value = get_example_file_path(os.path.join(directory, value))
+                elif not isinstance(iface, Textbox):
+                    try:
+                        value = json.loads(value)  # Numbers, booleans and lists are stored as JSON.
+                    except ValueError:
+                        pass
+                example_set.append(value)
+            examples.append(example_set)
+    return examples
+
 
 class Interface:
     """
@@ -45,7 +158,11 @@ class Interface:
                  server_port=None, server_name=networking.LOCALHOST_NAME,
                  allow_screenshot=True, allow_flagging=True,
                  embedding="default",
-                 flagging_dir="flagged", analytics_enabled=True):
+                 flagging_dir="flagged", analytics_enabled=True,
+                 rate_limits=None, max_concurrent_requests=None, max_queued_per_client=None,
+                 cache_examples=False, batch=False, max_batch_size=32,
+                 interpretation_workers=None, max_interpretation_workers_per_request=None,
+                 interpretation_budget=100, interpretation_cache_size=32):
 
         """
         Parameters:
@@ -53,12 +170,19 @@ class Interface:
         inputs (Union[str, List[Union[str, InputComponent]]]): a single Gradio input component, or list of Gradio input components. Components can either be passed as instantiated objects, or referred to by their string shortcuts. The number of input components should match the number of parameters in fn.
         outputs (Union[str, List[Union[str, OutputComponent]]]): a single Gradio output component, or list of Gradio output components. Components can either be passed as instantiated objects, or referred to by their string shortcuts. The number of output components should match the number of values returned by fn.
         verbose (bool): whether to print detailed information during launch.
-        examples (List[List[Any]]): sample inputs for the function; if provided, appears below the UI components and can be used to populate the interface. Should be nested list, in which the outer list consists of samples and each inner list consists of an input corresponding to each input component.
+        examples (Union[List[List[Any]], str]): sample inputs for the function; if provided, appears below the UI components and can be used to populate the interface. Should be nested list, in which the outer list consists of samples and each inner list consists of an input corresponding to each input component. Can also be the path to a CSV file with a header row and one example per row (such as a flagging log.csv), or to a directory that contains such a log.csv or, for a single input component, one example file per file. If there are more than 100 examples, they are sent to the browser a page at a time.
         examples_per_page (int): If examples are provided, how many to display per page.
+        cache_examples (bool): if True, the outputs of the examples are computed once when the interface is launched (in parallel), stored on disk in the `gradio_cached_examples` directory, and sent with the interface, so example outputs appear without running the model for every visitor. The cache is keyed by the source code of fn, the options of the input and output components and the contents of the examples, and examples whose prediction fails are tried again on the next launch; delete the directory if fn's behavior changes in a way its source does not show (e.g. new model weights).
         live (bool): whether the interface should automatically reload on change.
         layout (str): Layout of input and output panels. "horizontal" arranges them as two columns of equal height, "unaligned" arranges them as two columns of unequal height, and "vertical" arranges them vertically.
         capture_session (bool): if True, captures the default graph and session (needed for Tensorflow 1.x)
-        interpretation (Union[Callable, str]): function that provides interpretation explaining prediction output. Pass "default" to use built-in interpreter. 
+        interpretation (Union[Callable, str]): function that provides interpretation explaining prediction output. Pass "default" to use built-in interpreter, which removes each part of the input in turn (so its cost grows with the size of the input), or "shapley" to estimate Shapley values of the parts of the input (tokens, image segments, audio segments or dataframe cells) from a sample of at most `interpretation_budget` combinations of them. Components whose input is not split into parts use the default interpreter.
+        batch (bool): if True, fn is called with a list of values for each input component and should return a list of values for each output component (a tuple of lists if it has several outputs). Single predictions are sent as batches of one, and default interpretation sends its perturbed inputs in batches.
+        max_batch_size (int): if `batch` is True, the maximum number of inputs sent to fn in one call.
+        interpretation_workers (int): if provided, default interpretation evaluates its perturbed inputs concurrently on a pool of this many threads, shared by all requests. Useful when fn releases the GIL (as numpy, PyTorch and TensorFlow do) or waits on I/O.
+        max_interpretation_workers_per_request (int): the maximum number of pool threads a single interpretation request may use at once; defaults to `interpretation_workers`.
+        interpretation_budget (int): if `interpretation` is "shapley", the maximum number of model calls to interpret each input component.
+        interpretation_cache_size (int): number of recently interpreted inputs whose "default" or "shapley" interpretation is kept in memory, so interpreting them again does not run the model; 0 disables the cache. The cache also holds the model's output on each neighbor, and uses at most about 256 MB (`MAX_INTERPRETATION_CACHE_BYTES`).
         title (str): a title for the interface; if provided, appears above the input and output components.
         description (str): a description for the interface; if provided, appears above the input and output components.
         thumbnail (str): path to image or src to use as display picture for models listed in gradio.app/hub
@@ -66,6 +190,9 @@ class Interface:
         allow_screenshot (bool): if False, users will not see a button to take a screenshot of the interface.
         allow_flagging (bool): if False, users will not see a button to flag an input and output.
         flagging_dir (str): what to name the dir where flagged data is stored.
+        rate_limits (Dict[str, Tuple[float, int]]): per-client rate limits, mapping a route ("predict", "interpret", "predict_examples", "flag", "examples", "score_similarity", "view_embeddings", "update_embeddings", "alternative_output") to a (requests per second, burst size) tuple. Clients are identified by IP address, so all clients of a share link share the limits.
+        max_concurrent_requests (int): if provided, at most this many model requests run at once, and waiting requests are shared out round-robin between clients so that one client cannot starve the others.
+        max_queued_per_client (int): if provided with `max_concurrent_requests`, requests from a client that already has this many requests waiting are rejected.
         """
 
         def get_input_instance(iface):
@@ -103,6 +230,11 @@ class Interface:
 
         self.output_interfaces *= len(fn)
         self.predict = fn
+        self.batch = batch
+        self.max_batch_size = max_batch_size
+        self.interpretation_pool = ThreadPoolExecutor(max_workers=interpretation_workers) \
+            if interpretation_workers else None
+        self.max_interpretation_workers_per_request = max_interpretation_workers_per_request or interpretation_workers
         self.verbose = verbose
         self.status = "OFF"
         self.live = live
@@ -111,14 +243,27 @@ class Interface:
         self.show_output = show_output
         self.flag_hash = random.getrandbits(32)
         self.capture_session = capture_session
-        self.interpretation = interpretation            
+        self.interpretation = interpretation
+        self.interpretation_budget = interpretation_budget
+        self.interpretation_cache_size = interpretation_cache_size
+        self.interpretation_cache = collections.OrderedDict()  # Maps a cache key to an interpretation and its size.
+        self.interpretation_cache_bytes = 0
+        self.interpretation_cache_lock = threading.Lock()
+        self.stored_alternative_outputs = collections.OrderedDict()  # Maps an id to its expiry, raw outputs and size.
+        self.stored_alternative_outputs_bytes = 0
+        self.alternative_outputs_lock = threading.Lock()
         self.session = None
         self.server_name = server_name
         self.title = title
         self.description = description
         self.thumbnail = thumbnail
-        self.examples = examples
+        if isinstance(examples, str):
+            examples = load_examples_from_path(examples, self.input_interfaces)
+        self._examples = examples
+        self.example_sort_orders = {}
         self.examples_per_page = examples_per_page
+        self.cache_examples = cache_examples
+        self.cached_examples = {}
         self.server_port = server_port
         self.simple_server = None
         self.allow_screenshot = allow_screenshot
@@ -129,6 +274,12 @@ class Interface:
         self.save_to = None
         self.share = None
         self.embedding = embedding
+        self.example_embedding_index = None
+        self.example_projection = None
+        self.example_embedding_lock = threading.RLock()
+        self.rate_limits = rate_limits
+        self.max_concurrent_requests = max_concurrent_requests
+        self.max_queued_per_client = max_queued_per_client
 
         data = {'fn': fn,
                 'inputs': inputs,
@@ -167,6 +318,20 @@ class Interface:
             except requests.ConnectionError:
                 pass  # do not push analytics if no network
 
+    @property
+    def examples(self):
+        return self._examples
+
+    @examples.setter
+    def examples(self, examples):
+        if isinstance(examples, str):
+            examples = load_examples_from_path(examples, self.input_interfaces)
+        self._examples = examples
+        # Invalidate the cached embeddings, projection and orderings of the previous examples.
+        self.example_embedding_index = None
+        self.example_projection = None
+        self.example_sort_orders = {}
+
     def get_config_file(self):
         config = {
             "input_interfaces": [
@@ -200,44 +365,160 @@ class Interface:
         except ValueError:
             pass
         if self.examples is not None:
-            processed_examples = []
-            for example_set in self.examples:
-                processed_set = []
-                for iface, example in zip(self.input_interfaces, example_set):
-                    processed_set.append(example)
-                processed_examples.append(processed_set)
-            config["examples"] = processed_examples
+            config["num_examples"] = len(self.examples)
+            if len(self.examples) <= INLINE_EXAMPLES_LIMIT:
+                processed_examples = []
+                for example_set in self.examples:
+                    processed_set = []
+                    for iface, example in zip(self.input_interfaces, example_set):
+                        processed_set.append(example)
+                    processed_examples.append(processed_set)
+                config["examples"] = processed_examples
+                if self.cached_examples:
+                    config["cached_examples"] = self.cached_examples
+            elif self.cached_examples:
+                config["cached_examples"] = {}  # Cached outputs are sent with each page of examples.
         return config
 
-    def run_prediction(self, processed_input, return_duration=False):
-        predictions = []
-        durations = []
-        for predict_fn in self.predict:
-            start = time.time()
-            if self.capture_session and self.session is not None:
-                graph, sess = self.session
-                with graph.as_default(), sess.as_default():
-                    prediction = predict_fn(*processed_input)
+    def get_sorted_example_ids(self, sort_column=None, descending=False):
+        """
+        Returns the indices of the examples, ordered by the value of input `sort_column` (numbers before strings), or
+        in their original order if `sort_column` is None. Orderings are cached per column.
+        """
+        if sort_column is None:
+            example_ids = list(range(len(self.examples)))
+        else:
+            if sort_column not in self.example_sort_orders:
+                def sort_key(example_id):
+                    value = self.examples[example_id][sort_column]
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        return (0, value, "")
+                    return (1, 0, str(value))
+                self.example_sort_orders[sort_column] = sorted(range(len(self.examples)), key=sort_key)
+            example_ids = self.example_sort_orders[sort_column]
+        return example_ids[::-1] if descending else example_ids
+
+    def call_predict_fn(self, predict_fn, processed_input):
+        if self.capture_session and self.session is not None:
+            graph, sess = self.session
+            with graph.as_default(), sess.as_default():
+                return predict_fn(*processed_input)
+        try:
+            return predict_fn(*processed_input)
+        except ValueError as exception:
+            if str(exception).endswith("is not an element of this graph."):
+                raise ValueError(strings.en["TF1_ERROR"])
             else:
-                try:
-                    prediction = predict_fn(*processed_input)
-                except ValueError as exception:
-                    if str(exception).endswith("is not an element of this graph."):
-                        raise ValueError(strings.en["TF1_ERROR"])
-                    else:
-                        raise exception
-            duration = time.time() - start
+                raise exception
+
+    def run_prediction(self, processed_input, return_duration=False):
+        if self.batch:
+            predictions, durations = self.run_batch_prediction([processed_input], return_duration=True)
+            predictions = predictions[0]
+        else:
+            predictions = []
+            durations = []
+            for predict_fn in self.predict:
+                start = time.time()
+                prediction = self.call_predict_fn(predict_fn, processed_input)
+                duration = time.time() - start
+
+                if len(self.output_interfaces) == len(self.predict):
+                    prediction = [prediction]
+                durations.append(duration)
+                predictions.extend(prediction)
 
-            if len(self.output_interfaces) == len(self.predict):
-                prediction = [prediction]
-            durations.append(duration)
-            predictions.extend(prediction)
-        
         if return_duration:
             return predictions, durations
         else:
             return predictions
 
+    def run_batch_prediction(self, processed_inputs, return_duration=False):
+        """
+        Runs the prediction(s) on several sets of preprocessed inputs. If fn supports batching, it is called once per
+        chunk of at most `max_batch_size` sets of inputs; otherwise, once per set.
+        Parameters:
+        processed_inputs (List[List[Any]]): sets of preprocessed inputs, each with one value per input component.
+        Returns:
+        predictions (List[List[Any]]): the predictions for each set of inputs, one per output component.
+        durations (List[float]): if `return_duration` is True, the total time spent in each prediction function.
+        """
+        if not self.batch:
+            predictions, durations = [], [0] * len(self.predict)
+            for processed_input in processed_inputs:
+                prediction, prediction_durations = self.run_prediction(processed_input, return_duration=True)
+                predictions.append(prediction)
+                durations = [total + duration for total, duration in zip(durations, prediction_durations)]
+            return (predictions, durations) if return_duration else predictions
+        predictions = [[] for _ in processed_inputs]
+        durations = []
+        for predict_fn in self.predict:
+            duration = 0
+            for start in range(0, len(processed_inputs), self.max_batch_size):
+                chunk = processed_inputs[start:start + self.max_batch_size]
+                batched_input = [list(values) for values in zip(*chunk)]
+                chunk_start = time.time()
+                batched_prediction = self.call_predict_fn(predict_fn, batched_input)
+                duration += time.time() - chunk_start
+                if len(self.output_interfaces) == len(self.predict):
+                    batched_prediction = [batched_prediction]
+                for i, prediction in enumerate(zip(*batched_prediction)):
+                    predictions[start + i].extend(prediction)
+            durations.append(duration)
+        return (predictions, durations) if return_duration else predictions
+
+    def preprocess_interpretation_neighbors(self, processed_input, input_index, neighbor_values, exit_stack):
+        """
+        Preprocesses only the perturbed input of each neighbor; the other inputs are copies of the already
+        preprocessed values of the original input (see `copy_shared_input`), so fn may modify its inputs in place.
+        Parameters:
+        processed_input (List[Any]): the preprocessed original input, one value per input component.
+        input_index (int): index of the input component the neighbors perturb.
+        neighbor_values (List[Any]): neighbors of that input component, as returned by its interpretation methods.
+        exit_stack (contextlib.ExitStack): closes the copied file objects when the caller is done with the neighbors.
+        Returns:
+        (List[List[Any]]): the preprocessed input for each neighbor.
+        """
+        input_interface = self.input_interfaces[input_index]
+        processed_neighbor_inputs = []
+        for neighbor_input in neighbor_values:
+            processed_neighbor_input = [input_interface.preprocess_neighbor(neighbor_input) if i == input_index
+                                        else copy_shared_input(value, exit_stack)
+                                        for i, value in enumerate(processed_input)]
+            processed_neighbor_inputs.append(processed_neighbor_input)
+        return processed_neighbor_inputs
+
+    def predict_interpretation_neighbors(self, processed_input, input_index, neighbor_values):
+        """
+        Preprocesses the neighbors of input `input_index` and runs the prediction(s) on them, a chunk at a time (of
+        `max_batch_size` neighbors if fn supports batching, otherwise one), so only the chunks being evaluated are
+        held in memory. If an interpretation pool is configured, chunks are evaluated concurrently, with at most
+        `max_interpretation_workers_per_request` in flight for this request.
+        Returns:
+        (List[List[Any]]): the predictions for each neighbor.
+        """
+        chunk_size = self.max_batch_size if self.batch else 1
+        chunks = [neighbor_values[start:start + chunk_size] for start in range(0, len(neighbor_values), chunk_size)]
+
+        def predict_chunk(chunk):
+            with contextlib.ExitStack() as exit_stack:
+                return self.run_batch_prediction(
+                    self.preprocess_interpretation_neighbors(processed_input, input_index, chunk, exit_stack))
+
+        if self.interpretation_pool is None:
+            return [prediction for chunk in chunks for prediction in predict_chunk(chunk)]
+        chunk_predictions = [None] * len(chunks)
+        pending = {}
+        for chunk_index, chunk in enumerate(chunks):
+            if len(pending) >= self.max_interpretation_workers_per_request:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk_predictions[pending.pop(future)] = future.result()
+            pending[self.interpretation_pool.submit(predict_chunk, chunk)] = chunk_index
+        for future, chunk_index in pending.items():
+            chunk_predictions[chunk_index] = future.result()
+        return [prediction for predictions in chunk_predictions for prediction in predictions]
+
     def process(self, raw_input):
         """
         :param raw_input: a list of raw inputs to process and apply the prediction(s) on.
@@ -251,6 +532,88 @@ class Interface:
             predictions[i]) for i, output_interface in enumerate(self.output_interfaces)]
         return processed_output, durations
     
+    def process_example(self, example_id):
+        """
+        Runs the prediction(s) on the example with index `example_id`.
+        Returns:
+        (List[Any]): processed outputs of the example.
+        """
+        example_set = self.examples[example_id]
+        processed_example_set = [iface.preprocess_example(example)
+            for iface, example in zip(self.input_interfaces, example_set)]
+        predictions, _ = self.process(processed_example_set)
+        return predictions
+
+    def get_examples_cache_path(self, fns=None, extension=".json"):
+        """
+        Returns the path of a file that caches a computation over the examples, named by a hash of the source code of
+        `fns` (by default, the prediction function(s)), the gradio version, the configuration of the input and output
+        components (such as an Image's type or a Label's num_top_classes), and the contents of the examples
+        (including example files). Returns None if the source code of one of the functions is not available (e.g. a
+        lambda defined in an interactive session), as nothing else tells such functions apart; the computation is
+        then not cached.
+        """
+        key = hashlib.sha1(pkg_resources.require("gradio")[0].version.encode("utf-8"))
+        for fn in self.predict if fns is None else fns:
+            try:
+                key.update(inspect.getsource(fn).encode("utf-8"))
+            except (OSError, TypeError):
+                return None
+        for iface in self.input_interfaces + self.output_interfaces:
+            options = {name: value for name, value in vars(iface).items() if name != "test_input" and
+                       isinstance(value, (str, int, float, bool, list, tuple, type(None)))}  # Not caches or locks.
+            key.update(json.dumps([iface.__class__.__name__, iface.get_template_context(), options],
+                                  sort_keys=True, default=str).encode("utf-8"))
+        key.update(json.dumps(self.examples, sort_keys=True, default=str).encode("utf-8"))
+        for example_set in self.examples:
+            for example in example_set:
+                if isinstance(example, str) and os.path.isfile(example):
+                    with open(example, "rb") as example_file:
+                        key.update(example_file.read())
+        return os.path.join(CACHED_EXAMPLES_DIR, key.hexdigest() + extension)
+
+    def cache_example_outputs(self):
+        """
+        Loads the example outputs from the on-disk cache, and computes (in parallel) and caches those that aren't
+        cached yet. Examples that raise an error, or whose outputs can't be stored as JSON, are reported and left out,
+        as they are when examples are run from the browser, and are tried again on the next launch. A cache file that
+        can't be read is ignored.
+        """
+        cache_path = self.get_examples_cache_path()
+        self.cached_examples = {}
+        if cache_path is not None and os.path.exists(cache_path):
+            try:
+                with open(cache_path) as cache_file:
+                    self.cached_examples = {int(example_id): outputs
+                                            for example_id, outputs in json.load(cache_file).items()}
+            except (OSError, ValueError, AttributeError) as exception:
+                print("Ignoring the unreadable examples cache {}: {!r}".format(cache_path, exception))
+        missing_example_ids = [example_id for example_id in range(len(self.examples))
+                               if example_id not in self.cached_examples]
+        if not missing_example_ids:
+            return self.cached_examples
+
+        def try_process_example(example_id):
+            try:
+                output = self.process_example(example_id)
+                json.dumps(output)
+                return output
+            except Exception as exception:
+                print("Could not cache the output of example {}: {!r}".format(example_id, exception))
+                return None
+
+        with ThreadPoolExecutor(max_workers=min(len(missing_example_ids), os.cpu_count() or 1)) as executor:
+            outputs = list(executor.map(try_process_example, missing_example_ids))
+        new_outputs = {example_id: output for example_id, output in zip(missing_example_ids, outputs)
+                       if output is not None}
+        self.cached_examples.update(new_outputs)
+        if new_outputs and cache_path is not None:
+            os.makedirs(CACHED_EXAMPLES_DIR, exist_ok=True)
+            with tempfile.NamedTemporaryFile("w", dir=CACHED_EXAMPLES_DIR, delete=False) as cache_file:
+                json.dump(self.cached_examples, cache_file)
+            os.replace(cache_file.name, cache_path)  # Atomic, so an interrupted launch can't leave a partial file.
+        return self.cached_examples
+
     def embed(self, processed_input):
         if self.embedding == "default":
             embeddings = np.concatenate([input_interface.embed(processed_input[i])
@@ -259,40 +622,257 @@ class Interface:
             embeddings = self.embedding(*processed_input)
         return embeddings
 
+    def get_example_embedding_index(self):
+        """
+        Returns an `EmbeddingIndex` of the embeddings of all examples, computing it on first use. The index is
+        discarded whenever `examples` is reassigned. With at least `ANN_INDEX_MIN_EXAMPLES` examples, an approximate
+        `IVFIndex` is used instead, which is saved to disk and loaded from there on later launches.
+        """
+        with self.example_embedding_lock:
+            if self.example_embedding_index is None:
+                use_ann_index = len(self.examples) >= ANN_INDEX_MIN_EXAMPLES
+                if use_ann_index:
+                    if callable(self.embedding):
+                        embedding_fns = [self.embedding]
+                    else:
+                        embedding_fns = [type(iface).embed for iface in self.input_interfaces]
+                    index_path = self.get_examples_cache_path(fns=embedding_fns, extension=".npz")
+                    if index_path is not None and os.path.exists(index_path):
+                        self.example_embedding_index = IVFIndex.load(index_path)
+                        return self.example_embedding_index
+                example_embeddings = []
+                for example in self.examples:
+                    preprocessed_example = [iface.preprocess(iface.preprocess_example(x))
+                        for iface, x in zip(self.input_interfaces, example)]
+                    example_embeddings.append(self.embed(preprocessed_example))
+                if use_ann_index:
+                    self.example_embedding_index = IVFIndex(example_embeddings)
+                    if index_path is not None:
+                        os.makedirs(CACHED_EXAMPLES_DIR, exist_ok=True)
+                        self.example_embedding_index.save(index_path)
+                else:
+                    self.example_embedding_index = EmbeddingIndex(example_embeddings)
+            return self.example_embedding_index
+
+    def get_example_projection(self):
+        """
+        Returns the PCA model fit to the example embeddings and the 2D coordinates of each example, computing them on
+        first use. Like the embedding index, they are discarded whenever `examples` is reassigned.
+        """
+        with self.example_embedding_lock:
+            if self.example_projection is None:
+                index = self.get_example_embedding_index()
+                self.example_projection = fit_pca_to_embeddings(index.embeddings)
+            return self.example_projection
+
+    def project_input(self, raw_input):
+        """
+        Returns the 2D coordinates of the input in the projection of the example embeddings.
+        """
+        preprocessed_input = [input_interface.preprocess(raw_input[i])
+                              for i, input_interface in enumerate(self.input_interfaces)]
+        pca_model, _ = self.get_example_projection()
+        return transform_with_pca(pca_model, [self.embed(preprocessed_input)])
+
+    def score_similarity(self, raw_input, k=None):
+        """
+        Scores the similarity of the input to each of the examples.
+        Parameters:
+        raw_input (List[Any]): a list of raw inputs, one per input component.
+        k (int): if provided, only the `k` most similar examples are scored.
+        Returns:
+        example_ids (List[int]): indices of the scored examples; all examples in order if `k` is None, otherwise the `k` most similar, most similar first.
+        scores (List[float]): cosine similarity of the input to each of those examples.
+        """
+        preprocessed_input = [input_interface.preprocess(raw_input[i])
+                              for i, input_interface in enumerate(self.input_interfaces)]
+        input_embedding = self.embed(preprocessed_input)
+        index = self.get_example_embedding_index()
+        if k is None:
+            return list(range(len(index))), index.similarity(input_embedding).tolist()
+        example_ids, scores = index.top_k(input_embedding, k)
+        return example_ids.tolist(), scores.tolist()
+
+    def interpret_shapley(self, input_interface, features, evaluate):
+        """
+        Estimates the Shapley value of each feature of an input from the outputs of at most `interpretation_budget`
+        coalitions of features. If the budget allows more than removing each feature in turn, a coarse estimate from
+        those coalitions is generated first, then refined with the rest of the budget; coalitions are only evaluated
+        once across both stages.
+        Parameters:
+        input_interface (InputComponent): the component being interpreted.
+        features (Tuple[int, Any, Dict[str, Any]]): the result of the component's `get_interpretation_features`.
+        evaluate (Callable[[List[Any]], List[float]]): computes how much each of a list of neighbors changes the output.
+        Returns:
+        (Iterator[Tuple[List[Any], List[float], Dict[str, Any]]]): for each stage, a (neighbor_values, scores, interpret_kwargs) tuple, where neighbor_values is the neighbor with each feature removed, to pass to `get_interpretation_scores` (only some of them have been evaluated if the budget is smaller than the number of features); scores is the Shapley value of each feature; and interpret_kwargs are keyword arguments to pass to `get_interpretation_scores`.
+        """
+        num_features, state, interpret_kwargs = features
+        budgets = [self.interpretation_budget]
+        if num_features + 1 < self.interpretation_budget:
+            budgets.insert(0, num_features + 1)
+        coalition_neighbors, differences = {}, {}
+        for budget in budgets:
+            coalitions, weights = sample_coalitions(num_features, budget)
+            pending = {}
+            for coalition in coalitions:  # Sampled coalitions may repeat; each is only evaluated once.
+                key = coalition.tobytes()
+                if key not in coalition_neighbors:
+                    coalition_neighbors[key] = pending[key] = input_interface.get_coalition_neighbor(state, coalition)
+            differences.update(zip(pending, evaluate(list(pending.values()))))
+            values = [-differences[coalition.tobytes()] for coalition in coalitions]
+            shapley_values = solve_shapley_values(coalitions, weights, values, full_value=0)
+            neighbor_values = []
+            for index in range(num_features):
+                coalition = np.ones(num_features, dtype=bool)
+                coalition[index] = False
+                if coalition.tobytes() in coalition_neighbors:
+                    neighbor_values.append(coalition_neighbors[coalition.tobytes()])
+                else:
+                    neighbor_values.append(input_interface.get_coalition_neighbor(state, coalition))
+            yield neighbor_values, shapley_values.tolist(), interpret_kwargs
+
+    def get_interpretation_cache_key(self, raw_input):
+        """
+        Returns a hash of the input and of the settings that affect its interpretation, or None if the interpretation
+        is custom and so is not cached.
+        """
+        if self.interpretation not in ("default", "shapley"):
+            return None
+        settings = [self.interpretation, self.interpretation_budget]
+        for input_interface in self.input_interfaces:
+            settings.append({key: value for key, value in vars(input_interface).items()
+                             if key.startswith("interpretation_")})
+        payload = json.dumps([raw_input, settings], sort_keys=True, default=repr)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def postprocess_alternative_output(self, output):
+        """
+        Postprocesses the raw predictions on a neighbor, or returns None for a neighbor that was not evaluated.
+        """
+        if output is None:
+            return None
+        return [output_interface.postprocess(output[j]) for j, output_interface in enumerate(self.output_interfaces)]
+
+    def store_alternative_outputs(self, alternative_outputs, outputs_id=None):
+        """
+        Keeps the raw alternative outputs of an interpretation for `ALTERNATIVE_OUTPUTS_TTL` seconds, so that only
+        those that are looked at are postprocessed and sent. The outputs of at most `MAX_STORED_ALTERNATIVE_OUTPUTS`
+        interpretations are kept, using at most about `MAX_STORED_ALTERNATIVE_OUTPUTS_BYTES` of memory; the oldest
+        are dropped first, and the outputs of an interpretation larger than that are not kept at all.
+        Parameters:
+        alternative_outputs (List[List[Any]]): raw alternative outputs, as generated by `interpret_progressively`.
+        outputs_id (str): id of previously stored alternative outputs to replace, e.g. by a refined interpretation.
+        Returns:
+        (str): id to pass to `get_alternative_output`.
+        """
+        outputs_id = outputs_id or uuid.uuid4().hex
+        now = time.time()
+        size = get_approximate_size(alternative_outputs)
+        with self.alternative_outputs_lock:
+            if outputs_id in self.stored_alternative_outputs:
+                self.stored_alternative_outputs_bytes -= self.stored_alternative_outputs.pop(outputs_id)[2]
+            self.stored_alternative_outputs[outputs_id] = (now + ALTERNATIVE_OUTPUTS_TTL, alternative_outputs, size)
+            self.stored_alternative_outputs_bytes += size
+            while self.stored_alternative_outputs and (
+                    next(iter(self.stored_alternative_outputs.values()))[0] < now or
+                    len(self.stored_alternative_outputs) > MAX_STORED_ALTERNATIVE_OUTPUTS or
+                    self.stored_alternative_outputs_bytes > MAX_STORED_ALTERNATIVE_OUTPUTS_BYTES):
+                self.stored_alternative_outputs_bytes -= self.stored_alternative_outputs.popitem(last=False)[1][2]
+        return outputs_id
+
+    def get_alternative_output(self, outputs_id, input_index, neighbor_index):
+        """
+        Returns:
+        (List[Any]): the postprocessed output of each output component on a neighbor of input `input_index`, or None if the alternative outputs have expired, the neighbor was not evaluated or the indices are out of range.
+        """
+        with self.alternative_outputs_lock:
+            expiry, alternative_outputs, _ = self.stored_alternative_outputs.get(outputs_id, (0, None, 0))
+        if expiry < time.time() or input_index < 0 or neighbor_index < 0:
+            return None
+        try:
+            output = alternative_outputs[input_index][neighbor_index]
+        except (IndexError, TypeError):
+            return None
+        return self.postprocess_alternative_output(output)
+
     def interpret(self, raw_input):
         """
-        Runs the interpretation command for the machine learning model. Handles both the "default" out-of-the-box
-        interpretation for a certain set of UI component types, as well as the custom interpretation case.
+        Runs the interpretation command for the machine learning model. Handles both the "default" and "shapley"
+        out-of-the-box interpretation for a certain set of UI component types, as well as the custom interpretation case.
         :param raw_input: a list of raw inputs to apply the interpretation(s) on.
         """
-        if self.interpretation == "default":
+        interpretation = None
+        for interpretation in self.interpret_progressively(raw_input):
+            pass
+        if interpretation is None:
+            raise ValueError("Interpretation of the input did not produce a result.")
+        scores, alternative_outputs = interpretation
+        return scores, [[self.postprocess_alternative_output(output) for output in outputs]
+                        for outputs in alternative_outputs]
+
+    def interpret_progressively(self, raw_input):
+        """
+        Same as `interpret`, but generates partial results as they become available, with the raw predictions on
+        each neighbor as alternative outputs (None for neighbors that were not evaluated), which are postprocessed
+        with `postprocess_alternative_output` or stored with `store_alternative_outputs`: the scores of each input
+        component once it is interpreted (None until then), and for "shapley" interpretation, a coarse estimate of
+        each component's scores before the refined one. The last result is the complete interpretation. "default"
+        interpretation has no coarse stage, so an interface with a single input component only generates its
+        complete result. Complete results of "default" and "shapley" interpretation are kept in a cache of the
+        `interpretation_cache_size` most recently interpreted inputs, and generated at once for an input in the cache.
+        :param raw_input: a list of raw inputs to apply the interpretation(s) on.
+        """
+        cache_key = self.get_interpretation_cache_key(raw_input) if self.interpretation_cache_size else None
+        if cache_key is not None:
+            with self.interpretation_cache_lock:  # Not held while yielding, which may wait on a slow client.
+                cached_interpretation, _ = self.interpretation_cache.get(cache_key, (None, 0))
+                if cached_interpretation is not None:
+                    self.interpretation_cache.move_to_end(cache_key)
+            if cached_interpretation is not None:
+                yield cached_interpretation
+                return
+        if self.interpretation in ("default", "shapley"):
             processed_input = [input_interface.preprocess(raw_input[i])
                             for i, input_interface in enumerate(self.input_interfaces)]
-            original_output = self.run_prediction(processed_input)
-            scores, alternative_outputs = [], []
+            with contextlib.ExitStack() as exit_stack:
+                original_output = self.run_prediction([copy_shared_input(value, exit_stack)
+                                                       for value in processed_input])
+            scores, alternative_outputs = [None] * len(raw_input), [None] * len(raw_input)
             for i, x in enumerate(raw_input):
                 input_interface = self.input_interfaces[i]
-                neighbor_raw_input = list(raw_input)
-                neighbor_values, interpret_kwargs, interpret_by_removal = input_interface.get_interpretation_neighbors(x)
-                interface_scores = []
-                alternative_output = []
-                for neighbor_input in neighbor_values:
-                    neighbor_raw_input[i] = neighbor_input
-                    processed_neighbor_input = [input_interface.preprocess(neighbor_raw_input[i])
-                                    for i, input_interface in enumerate(self.input_interfaces)]
-                    neighbor_output = self.run_prediction(processed_neighbor_input)
-                    processed_neighbor_output = [output_interface.postprocess(
-                        neighbor_output[i]) for i, output_interface in enumerate(self.output_interfaces)]
-
-                    alternative_output.append(processed_neighbor_output)
-                    interface_scores.append(quantify_difference_in_label(self, original_output, neighbor_output))
-                alternative_outputs.append(alternative_output)
-                if not interpret_by_removal:
-                    interface_scores = [-score for score in interface_scores]
-                scores.append(
-                    input_interface.get_interpretation_scores(
-                        raw_input[i], neighbor_values, interface_scores, **interpret_kwargs))
-            return scores, alternative_outputs
+                neighbor_outputs = {}
+
+                def evaluate(neighbor_values):
+                    neighbor_scores = []
+                    for neighbor_input, neighbor_output in zip(
+                            neighbor_values, self.predict_interpretation_neighbors(processed_input, i, neighbor_values)):
+                        neighbor_outputs[id(neighbor_input)] = (neighbor_input, neighbor_output)
+                        neighbor_scores.append(quantify_difference_in_label(self, original_output, neighbor_output))
+                    return neighbor_scores
+
+                features = input_interface.get_interpretation_features(x) \
+                    if self.interpretation == "shapley" else None
+                if features is not None:
+                    stages = ((neighbor_values, interface_scores, interpret_kwargs, True) for
+                              neighbor_values, interface_scores, interpret_kwargs in
+                              self.interpret_shapley(input_interface, features, evaluate))
+                else:
+                    adaptive_interpretation = input_interface.interpret_adaptively(x, evaluate)
+                    if adaptive_interpretation is None:
+                        neighbor_values, interpret_kwargs, interpret_by_removal = \
+                            input_interface.get_interpretation_neighbors(x)
+                        stages = [(neighbor_values, evaluate(neighbor_values), interpret_kwargs, interpret_by_removal)]
+                    else:
+                        stages = [adaptive_interpretation]
+                for neighbor_values, interface_scores, interpret_kwargs, interpret_by_removal in stages:
+                    alternative_outputs[i] = [neighbor_outputs.get(id(neighbor_input), (None, None))[1]
+                                              for neighbor_input in neighbor_values]
+                    if not interpret_by_removal:
+                        interface_scores = [-score for score in interface_scores]
+                    scores[i] = input_interface.get_interpretation_scores(
+                        raw_input[i], neighbor_values, interface_scores, **interpret_kwargs)
+                    interpretation = list(scores), list(alternative_outputs)
+                    yield interpretation
         else:
             processed_input = [input_interface.preprocess(raw_input[i])
                                for i, input_interface in enumerate(self.input_interfaces)]
@@ -312,7 +892,18 @@ class Interface:
                         raise exception
             if len(raw_input) == 1:
                 interpretation = [interpretation]
-            return interpretation, []
+            yield interpretation, []
+            return
+        size = get_approximate_size(interpretation) if cache_key is not None else 0
+        if cache_key is not None and size <= MAX_INTERPRETATION_CACHE_BYTES:
+            with self.interpretation_cache_lock:
+                if cache_key in self.interpretation_cache:
+                    self.interpretation_cache_bytes -= self.interpretation_cache.pop(cache_key)[1]
+                self.interpretation_cache[cache_key] = (interpretation, size)
+                self.interpretation_cache_bytes += size
+                while len(self.interpretation_cache) > self.interpretation_cache_size or \
+                        self.interpretation_cache_bytes > MAX_INTERPRETATION_CACHE_BYTES:
+                    self.interpretation_cache_bytes -= self.interpretation_cache.popitem(last=False)[1][1]
 
     def close(self):
         if self.simple_server and not (self.simple_server.fileno() == -1):  # checks to see if server is running
@@ -356,6 +947,8 @@ class Interface:
         path_to_local_server (str): Locally accessible link
         share_url (str): Publicly accessible link (if share=True)
         """
+        if self.cache_examples and self.examples:
+            self.cache_example_outputs()
         config = self.get_config_file()
         networking.set_config(config)
         networking.set_meta_tags(self.title, self.description, self.thumbnail)
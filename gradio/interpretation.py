@@ -1,4 +1,7 @@
 from gradio.outputs import Label, Textbox
+import itertools
+import numpy as np
+from scipy.special import comb
 
 def diff(original, perturbed):
     try:  # try computing numerical difference
@@ -28,3 +31,70 @@ def quantify_difference_in_label(interface, original_output, perturbed_output):
         score = diff(post_original_output, post_perturbed_output)
         return score
 
+
+def sample_coalitions(num_features, budget, random_state=0):
+    """
+    Chooses at most `budget` coalitions of features to evaluate for KernelSHAP. Coalitions of each size are enumerated
+    while the budget allows, in order of their total Shapley kernel weight (so removing single features comes first);
+    the remaining budget is sampled from the other sizes in proportion to their kernel weight.
+    :param num_features: number of features.
+    :param budget: maximum number of coalitions, including the empty one.
+    :param random_state: seed of the sampling, so that the same input gets the same interpretation.
+    :return: a (coalitions, weights) tuple; coalitions is a boolean array with one row per coalition, True for the
+    features that are kept, starting with the empty coalition; weights is the regression weight of each coalition.
+    """
+    coalitions, weights = [np.zeros(num_features, dtype=bool)], [0.0]
+    if num_features < 2:
+        return np.array(coalitions), np.array(weights)
+    sizes = np.arange(1, num_features)
+    kernel = (num_features - 1) / (sizes * (num_features - sizes))
+    kernel /= kernel.sum()
+    remaining_budget = budget - 1
+    sampled_sizes = sorted(range(len(sizes)), key=lambda index: (-kernel[index], -sizes[index]))
+    while sampled_sizes:
+        size = sizes[sampled_sizes[0]]
+        count = comb(num_features, size, exact=True)
+        if count > remaining_budget:
+            break
+        for kept in itertools.combinations(range(num_features), size):
+            coalition = np.zeros(num_features, dtype=bool)
+            coalition[list(kept)] = True
+            coalitions.append(coalition)
+            weights.append(kernel[sampled_sizes[0]] / count)
+        remaining_budget -= count
+        sampled_sizes.pop(0)
+    if sampled_sizes and remaining_budget > 0:
+        random = np.random.RandomState(random_state)
+        sampled_kernel = kernel[sampled_sizes]
+        for index in random.choice(sampled_sizes, remaining_budget, p=sampled_kernel / sampled_kernel.sum()):
+            coalition = np.zeros(num_features, dtype=bool)
+            coalition[random.choice(num_features, sizes[index], replace=False)] = True
+            coalitions.append(coalition)
+            weights.append(sampled_kernel.sum() / remaining_budget)
+    return np.array(coalitions), np.array(weights)
+
+
+def solve_shapley_values(coalitions, weights, values, full_value):
+    """
+    Estimates the Shapley value of each feature by weighted least squares, constrained so that the values add up to
+    the difference between the value of the full and the empty coalition.
+    :param coalitions: boolean array of evaluated coalitions, starting with the empty one, as from `sample_coalitions`.
+    :param weights: regression weight of each coalition.
+    :param values: value of the output for each coalition.
+    :param full_value: value of the output with all features kept.
+    :return: numpy array of the Shapley value of each feature.
+    """
+    num_features = coalitions.shape[1]
+    values = np.asarray(values, dtype=float)
+    total = full_value - values[0]
+    if num_features == 1:
+        return np.array([total])
+    Z = coalitions[1:].astype(float)
+    y = values[1:] - values[0]
+    w = weights[1:]
+    system = np.zeros((num_features + 1, num_features + 1))
+    system[:num_features, :num_features] = 2 * Z.T @ (w[:, np.newaxis] * Z)
+    system[:num_features, num_features] = 1
+    system[num_features, :num_features] = 1
+    rhs = np.append(2 * Z.T @ (w * y), total)
+    return np.linalg.lstsq(system, rhs, rcond=None)[0][:num_features]
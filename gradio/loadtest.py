@@ -0,0 +1,223 @@
+"""
+Load generator for a running gradio interface, used to size hardware before putting an interface behind traffic.
+Reads the interface's `/config/`, builds valid payloads from the interface examples (or each input component's
+`test_input`), ramps up concurrency in stages and reports throughput, error rate and latency percentiles per
+endpoint. Run with:
+
+    python -m gradio.loadtest http://127.0.0.1:7860/ --concurrency 1,2,4,8 --duration 10
+"""
+
+import argparse
+import base64
+import mimetypes
+import os
+import threading
+import time
+import warnings
+import numpy as np
+import requests
+from gradio.inputs import InputComponent
+
+ENDPOINTS = ("predict", "interpret", "predict_examples")
+FILE_EXAMPLE_COMPONENTS = ("image", "sketchpad", "webcam", "audio", "microphone", "file")
+MAX_FETCHED_EXAMPLES = 100
+
+
+def get_input_classes():
+    classes = {}
+    pending = list(InputComponent.__subclasses__())
+    while pending:
+        cls = pending.pop()
+        classes[cls.__name__.lower()] = cls
+        pending.extend(cls.__subclasses__())
+    return classes
+
+
+def synthesize_test_input(component, context):
+    """
+    Rebuilds the input component from its name and template context in the config, and returns its `test_input`.
+    """
+    cls = get_input_classes()[component]
+    kwargs = {key: value for key, value in context.items() if key != "label"}
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        try:
+            iface = cls(**kwargs)
+        except TypeError:
+            iface = cls()
+    test_input = getattr(iface, "test_input", None)
+    if test_input is None:
+        raise ValueError("Cannot synthesize an input for the '{}' component; provide examples in the "
+                         "interface to load test it.".format(component))
+    return test_input
+
+
+def fetch_example_file(session, url, path):
+    """
+    Returns an example file as a base64 data url, fetched through the `/file/` route. Absolute paths (example files
+    outside the interface's working directory, which `/file/` does not serve) are read from disk instead, which works
+    when the load test runs on the same machine as the interface.
+    Returns:
+    (str): the data url, or None if the file can't be fetched or read.
+    """
+    if os.path.isabs(path):
+        if not os.path.isfile(path):
+            return None
+        with open(path, "rb") as file:
+            content = file.read()
+    else:
+        response = session.get(url + "file/" + path)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        content = response.content
+    mime_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    return "data:{};base64,{}".format(mime_type, str(base64.b64encode(content), 'utf-8'))
+
+
+def build_payloads(session, url, config):
+    """
+    Returns a list of valid `/api/predict/` payloads: one per example if the interface has examples (at most
+    `MAX_FETCHED_EXAMPLES` of them; example files are fetched through the `/file/` route and encoded, and examples
+    whose files can't be fetched are skipped), otherwise a single payload of test inputs.
+    """
+    components = [iface[0] for iface in config["input_interfaces"]]
+    examples = config.get("examples")
+    if config.get("num_examples") and examples is None:  # Examples that are not in the config are fetched by page.
+        response = session.post(url + "api/examples/", json={"page": 0, "page_size": MAX_FETCHED_EXAMPLES})
+        response.raise_for_status()
+        examples = list(response.json()["examples"].values())
+    if examples:
+        payloads = []
+        for example_set in examples:
+            payload = []
+            for component, example in zip(components, example_set):
+                if component in FILE_EXAMPLE_COMPONENTS:
+                    data = fetch_example_file(session, url, example)
+                    if data is None:
+                        print("Skipping an example: its file {} can't be fetched from the interface or read "
+                              "from disk.".format(example))
+                        break
+                    example = {"name": os.path.basename(example), "data": data, "is_local_example": False} \
+                        if component == "file" else data
+                payload.append(example)
+            else:
+                payloads.append(payload)
+        if payloads:
+            return payloads
+    return [[synthesize_test_input(component, context) for component, context in config["input_interfaces"]]]
+
+
+def run_stage(url, endpoint, payloads, concurrency, duration):
+    """
+    Sends requests to `endpoint` from `concurrency` workers for `duration` seconds, cycling through `payloads`.
+    Returns:
+    (Dict[str, Any]): throughput, error rate and latency percentiles (in seconds) for the stage.
+    """
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    deadline = time.time() + duration
+
+    def worker(offset):
+        session = requests.Session()
+        index = offset
+        while time.time() < deadline:
+            if endpoint == "predict_examples":
+                data = [index % len(payloads)]
+            else:
+                data = payloads[index % len(payloads)]
+            index += concurrency
+            start = time.time()
+            try:
+                ok = session.post(url + "api/{}/".format(endpoint), json={"data": data}).status_code == 200
+            except requests.RequestException:
+                ok = False
+            latency = time.time() - start
+            with lock:
+                latencies.append(latency)
+                if not ok:
+                    errors[0] += 1
+        session.close()
+
+    start = time.time()
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.time() - start
+    count = len(latencies)
+    percentiles = np.percentile(latencies, [50, 90, 99]) if count else [float("nan")] * 3
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": count,
+        "throughput": count / elapsed,
+        "error_rate": errors[0] / count if count else 0.0,
+        "p50": percentiles[0],
+        "p90": percentiles[1],
+        "p99": percentiles[2],
+        "max": max(latencies) if count else float("nan"),
+    }
+
+
+def run_load_test(url, endpoints=("predict",), concurrency_levels=(1, 2, 4, 8), duration=10):
+    """
+    Load tests a running interface.
+    Parameters:
+    url (str): url of the running interface.
+    endpoints (List[str]): endpoints to test, from "predict", "interpret" and "predict_examples". Endpoints the interface does not support are skipped.
+    concurrency_levels (List[int]): number of concurrent clients in each stage of the ramp.
+    duration (float): seconds to run each stage for.
+    Returns:
+    (List[Dict[str, Any]]): results of each stage, in the order they were run.
+    """
+    url = url.rstrip("/") + "/"
+    session = requests.Session()
+    config = session.get(url + "config/").json()
+    payloads = build_payloads(session, url, config)
+    session.close()
+    supported = {
+        "predict": True,
+        "interpret": config.get("allow_interpretation", False),
+        "predict_examples": bool(config.get("num_examples")),
+    }
+    results = []
+    for endpoint in endpoints:
+        if endpoint not in ENDPOINTS:
+            raise ValueError("Unknown endpoint: " + endpoint + ". Please choose from: " + ", ".join(ENDPOINTS) + ".")
+        if not supported[endpoint]:
+            continue
+        for concurrency in concurrency_levels:
+            results.append(run_stage(url, endpoint, payloads, concurrency, duration))
+    return results
+
+
+def format_report(results):
+    lines = ["{:<18}{:>12}{:>10}{:>10}{:>10}{:>10}{:>10}{:>10}{:>10}".format(
+        "endpoint", "concurrency", "requests", "req/s", "errors", "p50 (s)", "p90 (s)", "p99 (s)", "max (s)")]
+    for result in results:
+        lines.append("{:<18}{:>12}{:>10}{:>10.2f}{:>9.1f}%{:>10.3f}{:>10.3f}{:>10.3f}{:>10.3f}".format(
+            result["endpoint"], result["concurrency"], result["requests"], result["throughput"],
+            100 * result["error_rate"], result["p50"], result["p90"], result["p99"], result["max"]))
+    return "\n".join(lines)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog="python -m gradio.loadtest", description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument("url", help="url of the running interface")
+    parser.add_argument("--endpoints", default="predict",
+                        help="comma-separated endpoints to test, from: " + ", ".join(ENDPOINTS))
+    parser.add_argument("--concurrency", default="1,2,4,8",
+                        help="comma-separated number of concurrent clients for each stage of the ramp")
+    parser.add_argument("--duration", type=float, default=10, help="seconds to run each stage for")
+    args = parser.parse_args(args)
+    results = run_load_test(args.url,
+                            endpoints=args.endpoints.split(","),
+                            concurrency_levels=[int(c) for c in args.concurrency.split(",")],
+                            duration=args.duration)
+    print(format_report(results))
+
+
+if __name__ == "__main__":
+    main()
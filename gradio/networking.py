@@ -5,7 +5,8 @@ Defines helper methods useful for setting up ports, launching servers, and handl
 import os
 import socket
 import threading
-from flask import Flask, request, jsonify, abort, send_file, render_template
+from flask import Flask, request, jsonify, abort, send_file, send_from_directory, render_template, \
+    safe_join, Response, stream_with_context
 from flask_cachebuster import CacheBuster
 from flask_cors import CORS
 import threading
@@ -19,9 +20,13 @@ import requests
 import sys
 import csv
 import logging
+import contextlib
+import functools
+import math
 import gradio as gr
-from gradio.embeddings import calculate_similarity, fit_pca_to_embeddings, transform_with_pca
+from gradio import processing_utils
 from gradio.tunneling import create_tunnel
+from gradio.rate_limiting import RateLimiter, FairScheduler, RateLimitExceeded
 
 INITIAL_PORT_VALUE = int(os.getenv(
     'GRADIO_SERVER_PORT', "7860"))  # The http server will try to open on port 7860. If not available, 7861, 7862, etc.
@@ -34,15 +39,22 @@ GRADIO_API_SERVER = "https://api.gradio.app/v1/tunnel-request"
 STATIC_TEMPLATE_LIB = pkg_resources.resource_filename("gradio", "templates/")
 STATIC_PATH_LIB = pkg_resources.resource_filename("gradio", "static/")
 GRADIO_STATIC_ROOT = "https://gradio.app"
+THUMBNAIL_CACHE_DIR = "thumbnails"  # Inside the interface's CACHED_EXAMPLES_DIR.
+USE_X_SENDFILE = os.getenv(
+    'GRADIO_USE_X_SENDFILE', "False") == "True"  # Set when a front-end web server (nginx, Apache) handles X-Sendfile.
 
 app = Flask(__name__,
     template_folder=STATIC_TEMPLATE_LIB,
     static_folder=STATIC_PATH_LIB,
     static_url_path="/static/")
 CORS(app)
+app.use_x_sendfile = USE_X_SENDFILE
 cache_buster = CacheBuster(config={'extensions': ['.js', '.css'], 'hash_size': 5})
 cache_buster.init_app(app)
 app.app_globals = {}
+app.thumbnail_dir = None  # Set when the server is started.
+app.rate_limiter = None
+app.scheduler = None
 
 # Hide Flask default message
 cli = sys.modules['flask.cli']
@@ -90,6 +102,51 @@ def get_first_available_port(initial, final):
     )
 
 
+def get_client_id():
+    """
+    Identifies the client making the current request by its IP address, which (unlike a cookie or header) a client
+    can't change from one request to the next. All clients of a share link reach the server from the tunnel's
+    address, so they share one rate limit and one scheduler queue.
+    """
+    return request.remote_addr
+
+
+def limit_client(route, scheduled=True, streamed=False):
+    """
+    Decorator that applies the interface's per-client rate limit for `route` and, if `scheduled`, runs the request
+    in a slot of the fair-share scheduler. If `streamed`, the view returns a streamed response, and the slot is held
+    until the response has been sent. Rejected requests receive a 429 response with a Retry-After header.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            client = get_client_id()
+            try:
+                if app.rate_limiter is not None:
+                    app.rate_limiter.check(client, route)
+                if not scheduled or app.scheduler is None:
+                    return fn(*args, **kwargs)
+                if streamed:
+                    slot = contextlib.ExitStack()
+                    slot.enter_context(app.scheduler.slot(client))
+                    try:
+                        response = fn(*args, **kwargs)
+                    except BaseException:
+                        slot.close()
+                        raise
+                    response.call_on_close(slot.close)
+                    return response
+                with app.scheduler.slot(client):
+                    return fn(*args, **kwargs)
+            except RateLimitExceeded as exception:
+                response = jsonify(error=str(exception))
+                response.status_code = 429
+                response.headers["Retry-After"] = str(math.ceil(min(exception.retry_after, 86400)))
+                return response
+        return wrapper
+    return decorator
+
+
 @app.route("/", methods=["GET"])
 def main():
     return render_template("index.html",
@@ -114,6 +171,7 @@ def enable_sharing(path):
     
 
 @app.route("/api/predict/", methods=["POST"])
+@limit_client("predict")
 def predict():
     raw_input = request.json["data"]
     prediction, durations = app.interface.process(raw_input)
@@ -122,69 +180,76 @@ def predict():
 
 
 @app.route("/api/score_similarity/", methods=["POST"])
+@limit_client("score_similarity")
 def score_similarity():
     raw_input = request.json["data"]
-
-    preprocessed_input = [input_interface.preprocess(raw_input[i])
-                    for i, input_interface in enumerate(app.interface.input_interfaces)]
-    input_embedding = app.interface.embed(preprocessed_input)
-    scores = list()
-
-    for example in app.interface.examples:
-        preprocessed_example = [iface.preprocess(iface.preprocess_example(example))
-            for iface, example in zip(app.interface.input_interfaces, example)]
-        example_embedding = app.interface.embed(preprocessed_example)
-        scores.append(calculate_similarity(input_embedding, example_embedding))    
-    
-    return jsonify({"data": scores})
+    if "page" in request.json:  # Only the examples on the requested page of the similarity ordering are returned.
+        page = request.json["page"]
+        page_size = request.json.get("page_size", app.interface.examples_per_page)
+        example_ids, scores = app.interface.score_similarity(raw_input, k=(page + 1) * page_size)
+        response = get_examples_page_response(example_ids[page * page_size:], page)
+        response["data"] = scores[page * page_size:]
+        return jsonify(response)
+    k = request.json.get("k")
+    example_ids, scores = app.interface.score_similarity(raw_input, k=k)
+    if k is None:
+        return jsonify({"data": scores})
+    return jsonify({"data": scores, "example_ids": example_ids})
+
+
+def get_examples_page_response(example_ids, page):
+    return {
+        "example_ids": example_ids,
+        "examples": {example_id: app.interface.examples[example_id] for example_id in example_ids},
+        "outputs": {example_id: app.interface.cached_examples[example_id] for example_id in example_ids
+                    if example_id in app.interface.cached_examples},
+        "page": page,
+    }
+
+
+@app.route("/api/examples/", methods=["GET", "POST"])
+@limit_client("examples", scheduled=False)
+def get_examples():
+    params = request.json if request.method == "POST" else request.args
+    page = int(params.get("page", 0))
+    page_size = int(params.get("page_size", app.interface.examples_per_page))
+    sort_column = params.get("sort")
+    sort_column = None if sort_column is None else int(sort_column)
+    descending = params.get("descending") in (True, "true")
+    example_ids = app.interface.get_sorted_example_ids(sort_column, descending)
+    return jsonify(get_examples_page_response(example_ids[page * page_size:(page + 1) * page_size], page))
 
 
 @app.route("/api/view_embeddings/", methods=["POST"])
-def view_embeddings():    
-    sample_embedding = []
+@limit_client("view_embeddings")
+def view_embeddings():
+    _, example_embeddings_2d = app.interface.get_example_projection()
+    sample_embedding_2d = []
     if "data" in request.json:
-        raw_input = request.json["data"]
-        preprocessed_input = [input_interface.preprocess(raw_input[i])
-                        for i, input_interface in enumerate(app.interface.input_interfaces)]
-        sample_embedding.append(app.interface.embed(preprocessed_input))
-
-    example_embeddings = []
-    for example in app.interface.examples:
-        preprocessed_example = [iface.preprocess(iface.preprocess_example(example))
-            for iface, example in zip(app.interface.input_interfaces, example)]
-        example_embedding = app.interface.embed(preprocessed_example)
-        example_embeddings.append(example_embedding)
-    
-    pca_model, embeddings_2d = fit_pca_to_embeddings(sample_embedding + example_embeddings)
-    sample_embedding_2d = embeddings_2d[:len(sample_embedding)]
-    example_embeddings_2d = embeddings_2d[len(sample_embedding):]
-    app.pca_model = pca_model
+        sample_embedding_2d = app.interface.project_input(request.json["data"])
     return jsonify({"sample_embedding_2d": sample_embedding_2d, "example_embeddings_2d": example_embeddings_2d})
 
 
 @app.route("/api/update_embeddings/", methods=["POST"])
-def update_embeddings():    
-    sample_embedding, sample_embedding_2d = [], []
+@limit_client("update_embeddings")
+def update_embeddings():
+    sample_embedding_2d = []
     if "data" in request.json:
-        raw_input = request.json["data"]
-        preprocessed_input = [input_interface.preprocess(raw_input[i])
-                        for i, input_interface in enumerate(app.interface.input_interfaces)]
-        sample_embedding.append(app.interface.embed(preprocessed_input))
-        sample_embedding_2d = transform_with_pca(app.pca_model, sample_embedding)
-    
+        sample_embedding_2d = app.interface.project_input(request.json["data"])
     return jsonify({"sample_embedding_2d": sample_embedding_2d})
 
 
 @app.route("/api/predict_examples/", methods=["POST"])
+@limit_client("predict_examples")
 def predict_examples():
     example_ids = request.json["data"]
     predictions_set = {}
     for example_id in example_ids:
-        example_set = app.interface.examples[example_id]
-        processed_example_set = [iface.preprocess_example(example)
-            for iface, example in zip(app.interface.input_interfaces, example_set)]
+        if example_id in app.interface.cached_examples:
+            predictions_set[example_id] = app.interface.cached_examples[example_id]
+            continue
         try:
-            predictions, _ = app.interface.process(processed_example_set)
+            predictions = app.interface.process_example(example_id)
         except:
             continue
         predictions_set[example_id] = predictions
@@ -193,6 +258,7 @@ def predict_examples():
 
 
 @app.route("/api/flag/", methods=["POST"])
+@limit_client("flag", scheduled=False)
 def flag():
     flag_path = os.path.join(app.cwd, app.interface.flagging_dir)
     os.makedirs(flag_path,
@@ -229,18 +295,126 @@ def flag():
 
 
 @app.route("/api/interpret/", methods=["POST"])
+@limit_client("interpret")
 def interpret():
     raw_input = request.json["data"]
-    interpretation_scores, alternative_outputs = app.interface.interpret(raw_input)
+    for interpretation_scores, alternative_outputs in app.interface.interpret_progressively(raw_input):
+        pass
     return jsonify({
         "interpretation_scores": interpretation_scores,
-        "alternative_outputs": alternative_outputs
+        "alternative_outputs_id": app.interface.store_alternative_outputs(alternative_outputs)
     })
 
 
+@app.route("/api/interpret/stream/", methods=["POST"])
+@limit_client("interpret", streamed=True)
+def interpret_stream():
+    """
+    Same as `/api/interpret/`, but streams partial interpretations as they are computed, as newline-delimited JSON
+    objects with the same keys; the last one is the complete interpretation. Input components that are not
+    interpreted yet have null scores.
+    """
+    raw_input = request.json["data"]
+
+    def generate():
+        outputs_id = None
+        for interpretation_scores, alternative_outputs in app.interface.interpret_progressively(raw_input):
+            outputs_id = app.interface.store_alternative_outputs(alternative_outputs, outputs_id)
+            yield json.dumps({
+                "interpretation_scores": interpretation_scores,
+                "alternative_outputs_id": outputs_id
+            }, cls=app.json_encoder) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+@app.route("/api/alternative_output/", methods=["POST"])
+@limit_client("alternative_output", scheduled=False)
+def alternative_output():
+    """
+    Returns the output on one neighbor of an interpretation, given the `alternative_outputs_id` of the
+    interpretation, the index of the input component and the index of the neighbor.
+    """
+    output = app.interface.get_alternative_output(
+        request.json["id"], int(request.json["input_index"]), int(request.json["neighbor_index"]))
+    if output is None:
+        abort(404)
+    return jsonify({"data": output})
+
+
+def get_example_files(interface):
+    """
+    Returns the set of normalized paths (relative to the working directory) of files referenced by the examples.
+    """
+    example_files = set()
+    for example_set in interface.examples or []:
+        for example in example_set:
+            if isinstance(example, str) and os.path.isfile(os.path.join(app.cwd, example)):
+                example_files.add(os.path.normpath(example))
+    return example_files
+
+
+class LargeBlockFileWrapper:
+    """
+    Fallback for servers without a native `wsgi.file_wrapper` (such as the development server). Servers that do
+    provide one (gunicorn, uWSGI, mod_wsgi) use it directly and send files with the OS sendfile call.
+    """
+    block_size = 1024 * 1024
+
+    def __init__(self, file, buffer_size=block_size):
+        self.file = file
+        self.buffer_size = max(buffer_size, self.block_size)
+
+    def close(self):
+        self.file.close()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        data = self.file.read(self.buffer_size)
+        if data:
+            return data
+        raise StopIteration()
+
+
 @app.route("/file/<path:path>", methods=["GET"])
 def file(path):
-    return send_file(os.path.join(app.cwd, path))
+    """
+    Serves files from the working directory with ETag / Last-Modified validation and HTTP Range support, so
+    browsers can seek in audio without downloading the whole file. Browsers revalidate their cached copy on every use
+    (a 304 response if it is unchanged), so an edited example file is picked up without changing its URL.
+    """
+    request.environ.setdefault("wsgi.file_wrapper", LargeBlockFileWrapper)
+    response = send_from_directory(app.cwd, path, cache_timeout=0)
+    response.cache_control.no_cache = True
+    return response
+
+
+@app.route("/thumbnail/<path:path>", methods=["GET"])
+def thumbnail(path):
+    """
+    Serves a small cached thumbnail of an image file, or a waveform preview of a wav file, from the working directory,
+    for the examples table.
+    """
+    full_path = safe_join(app.cwd, path)
+    if not os.path.isfile(full_path):
+        abort(404)
+    thumbnail_path = processing_utils.get_thumbnail(full_path, app.thumbnail_dir)
+    if thumbnail_path is None:
+        abort(404)
+    response = send_file(thumbnail_path, conditional=True, cache_timeout=0)
+    response.cache_control.no_cache = True  # Revalidated like /file/, as the thumbnail changes with the file.
+    return response
+
+
+def create_example_thumbnails():
+    for path in app.example_files:
+        try:
+            processing_utils.get_thumbnail(os.path.join(app.cwd, path), app.thumbnail_dir)
+        except Exception:  # The thumbnail is created (or the error reported) when it is first requested instead.
+            pass
+
 
 def start_server(interface, server_name, server_port=None):
     if server_port is None:
@@ -250,6 +424,12 @@ def start_server(interface, server_name, server_port=None):
     )
     app.interface = interface
     app.cwd = os.getcwd()
+    app.example_files = get_example_files(interface)
+    app.thumbnail_dir = os.path.join(app.cwd, gr.interface.CACHED_EXAMPLES_DIR, THUMBNAIL_CACHE_DIR)
+    threading.Thread(target=create_example_thumbnails, daemon=True).start()
+    app.rate_limiter = RateLimiter(interface.rate_limits) if interface.rate_limits else None
+    app.scheduler = FairScheduler(interface.max_concurrent_requests, interface.max_queued_per_client) \
+        if interface.max_concurrent_requests else None
     log = logging.getLogger('werkzeug')
     log.setLevel(logging.ERROR)
     if interface.save_to is not None:
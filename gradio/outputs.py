@@ -8,7 +8,6 @@ from gradio.component import Component
 import numpy as np
 import json
 from gradio import processing_utils
-import datetime
 import operator
 from numbers import Number
 import warnings
@@ -131,18 +130,36 @@ class Image(OutputComponent):
     Output type: Union[numpy.array, PIL.Image, str, matplotlib.pyplot]
     '''
 
-    def __init__(self, type="auto", plot=False, label=None):
+    def __init__(self, type="auto", plot=False, label=None, format="png", quality=None, compress_level=None,
+                 max_dimension=None):
         '''
         Parameters:
         type (str): Type of value to be passed to component. "numpy" expects a numpy array with shape (width, height, 3), "pil" expects a PIL image object, "file" expects a file path to the saved image, "plot" expects a matplotlib.pyplot object, "auto" detects return type.
         plot (bool): DEPRECATED. Whether to expect a plot to be returned by the function.
         label (str): component name in interface.
+        format (str): format numpy and PIL images are sent to the browser in: "png" (lossless), "jpeg" or "webp". JPEG and WebP encode large photographic images much faster and smaller than PNG.
+        quality (int): for "jpeg" and "webp", the quality of the encoding from 1 to 100; if None, 75 for JPEG and 80 for WebP.
+        compress_level (int): for "png", the compression level from 0 (fastest, largest) to 9 (slowest, smallest); if None, 6.
+        max_dimension (int): if provided, numpy and PIL images with a larger width or height are downscaled to fit before they are encoded, keeping their aspect ratio.
         '''
         if plot:
             warnings.warn("The 'plot' parameter has been deprecated. Set parameter 'type' to 'plot' instead.", DeprecationWarning)
             self.type = "plot"
         else:
             self.type = type
+        format = "jpeg" if format.lower() == "jpg" else format.lower()
+        if format not in processing_utils.IMAGE_ENCODING_FORMATS:
+            raise ValueError("Unknown format: " + format + ". Please choose from: 'png', 'jpeg', 'webp'.")
+        if quality is not None and not (isinstance(quality, int) and 1 <= quality <= 100):
+            raise ValueError("quality must be an integer from 1 to 100, got " + repr(quality) + ".")
+        if compress_level is not None and not (isinstance(compress_level, int) and 0 <= compress_level <= 9):
+            raise ValueError("compress_level must be an integer from 0 to 9, got " + repr(compress_level) + ".")
+        if max_dimension is not None and not (isinstance(max_dimension, int) and max_dimension > 0):
+            raise ValueError("max_dimension must be a positive integer, got " + repr(max_dimension) + ".")
+        self.format = format
+        self.quality = quality
+        self.compress_level = compress_level
+        self.max_dimension = max_dimension
         super().__init__(label)
 
     @classmethod
@@ -165,10 +182,14 @@ class Image(OutputComponent):
                 dtype = "plot"
         else:
             dtype = self.type
-        if dtype in ["numpy", "pil"]:
+        encoding_options = {"format": self.format, "quality": self.quality, "compress_level": self.compress_level,
+                            "max_dimension": self.max_dimension}
+        if dtype == "pil" and y.mode in processing_utils.PIL_ENCODABLE_MODES:
+            return processing_utils.encode_image_to_base64(y, **encoding_options)
+        elif dtype in ["numpy", "pil"]:
             if dtype == "pil":
                 y = np.array(y)
-            return processing_utils.encode_array_to_base64(y)
+            return processing_utils.encode_array_to_base64(y, **encoding_options)
         elif dtype == "file":
             return processing_utils.encode_file_to_base64(y)
         elif dtype == "plot":
@@ -178,13 +199,9 @@ class Image(OutputComponent):
 
     def rebuild(self, dir, data):
         """
-        Default rebuild method to decode a base64 image
+        Default rebuild method to store a base64 image, deduplicated by its contents
         """
-        im = processing_utils.decode_base64_to_image(data)
-        timestamp = datetime.datetime.now()
-        filename = 'output_{}_{}.png'.format(self.label, timestamp.strftime("%Y-%m-%d-%H-%M-%S"))
-        im.save('{}/{}'.format(dir, filename), 'PNG')
-        return filename
+        return processing_utils.save_base64_to_flagged_file(dir, data)
 
 class KeyValues(OutputComponent):
     '''
@@ -283,6 +300,12 @@ class Audio(OutputComponent):
         else:
             raise ValueError("Unknown type: " + self.type + ". Please choose from: 'numpy', 'file'.")
 
+    def rebuild(self, dir, data):
+        """
+        Default rebuild method to store a base64 audio file, deduplicated by its contents
+        """
+        return processing_utils.save_base64_to_flagged_file(dir, data)
+
 
 class JSON(OutputComponent):
     '''
@@ -1,20 +1,36 @@
 from PIL import Image, ImageOps
 from io import BytesIO
 import base64
+import binascii
 import tempfile
+import hashlib
+import mimetypes
+import os
+import re
+import threading
 import scipy.io.wavfile
 from scipy.fftpack import dct
 import numpy as np
 import skimage
 
+BASE64_DECODE_CHUNK_SIZE = 1 << 20  # Characters of base64 decoded at a time; must be a multiple of 4.
+NON_BASE64_CHARACTERS = re.compile(r"[^A-Za-z0-9+/=]")
+
 
 #########################
 # IMAGE PRE-PROCESSING
 #########################
-def decode_base64_to_image(encoding):
-    content = encoding.split(';')[1]
-    image_encoded = content.split(',')[1]
-    return Image.open(BytesIO(base64.b64decode(image_encoded)))
+def decode_base64_to_image(encoding, target_size=None):
+    """
+    Opens the image in a base64 data url.
+    :param target_size: if provided, a (width, height) the image will be resized to; JPEG images that are at least
+    twice as large in both dimensions are decoded at a reduced scale (1/2, 1/4 or 1/8) that is still at least this
+    large, which is much faster and uses less memory than decoding the full image.
+    """
+    im = Image.open(decode_base64_to_buffer(encoding))
+    if target_size is not None and im.format == "JPEG":
+        im.draft(im.mode, tuple(target_size))
+    return im
 
 
 def encode_file_to_base64(f, type="image", ext=None, header=True):
@@ -35,13 +51,65 @@ def encode_plot_to_base64(plt):
     base64_str = str(base64.b64encode(bytes_data), 'utf-8')
     return "data:image/png;base64," + base64_str
 
-def encode_array_to_base64(image_array):
+def image_array_to_uint8(image_array):
+    """
+    Converts an image array to uint8 like `skimage.img_as_ubyte`, without copying uint8 arrays, and without
+    skimage's range checks for boolean arrays and float arrays with values between 0 and 1.
+    """
+    if image_array.dtype == np.uint8:
+        return image_array
+    if image_array.dtype == bool:
+        return image_array.astype(np.uint8) * np.uint8(255)
+    if np.issubdtype(image_array.dtype, np.floating) and image_array.size and \
+            image_array.min() >= 0 and image_array.max() <= 1:
+        return np.rint(image_array * 255).astype(np.uint8)
+    return skimage.img_as_ubyte(image_array)
+
+
+IMAGE_ENCODING_FORMATS = {"png": "PNG", "jpeg": "JPEG", "webp": "WEBP"}
+PIL_ENCODABLE_MODES = ("1", "L", "LA", "P", "RGB", "RGBA")  # PIL images in other modes are converted through numpy.
+
+
+def encode_image_to_base64(image, format="png", quality=None, compress_level=None, max_dimension=None):
+    """
+    Encodes a PIL image into a base64 data url.
+    :param format: "png", "jpeg" or "webp".
+    :param quality: for "jpeg" and "webp", the quality of the encoding from 1 to 100; PIL's default if None.
+    :param compress_level: for "png", the zlib compression level from 0 (fastest, largest) to 9; PIL's default if None.
+    :param max_dimension: if provided, images with a larger width or height are downscaled to fit, keeping their
+    aspect ratio.
+    """
+    format = format.lower()
+    if format == "jpg":
+        format = "jpeg"
+    if format not in IMAGE_ENCODING_FORMATS:
+        raise ValueError("Unknown format: " + str(format) + ". Please choose from: 'png', 'jpeg', 'webp'.")
+    if max_dimension is not None and max(image.size) > max_dimension:
+        image = image.copy()
+        image.thumbnail((max_dimension, max_dimension), Image.BILINEAR)
+    options = {}
+    if format == "png":
+        if compress_level is not None:
+            options["compress_level"] = compress_level
+    else:
+        if quality is not None:
+            options["quality"] = quality
+        if format == "jpeg" and image.mode not in ("L", "RGB", "CMYK"):  # JPEG has no alpha channel.
+            image = image.convert("L" if image.mode in ("LA", "I", "F") else "RGB")
     with BytesIO() as output_bytes:
-        PIL_image = Image.fromarray(skimage.img_as_ubyte(image_array))
-        PIL_image.save(output_bytes, 'PNG')
+        image.save(output_bytes, IMAGE_ENCODING_FORMATS[format], **options)
         bytes_data = output_bytes.getvalue()
     base64_str = str(base64.b64encode(bytes_data), 'utf-8')
-    return "data:image/png;base64," + base64_str
+    return "data:image/" + format + ";base64," + base64_str
+
+
+def encode_array_to_base64(image_array, format="png", quality=None, compress_level=None, max_dimension=None):
+    """
+    Encodes an image array into a base64 data url; see `encode_image_to_base64` for the encoding options.
+    """
+    PIL_image = Image.fromarray(image_array_to_uint8(image_array))
+    return encode_image_to_base64(PIL_image, format=format, quality=quality, compress_level=compress_level,
+                                  max_dimension=max_dimension)
 
 
 def resize_and_crop(img, size, crop_type='center'):
@@ -67,9 +135,40 @@ def resize_and_crop(img, size, crop_type='center'):
 # OUTPUT
 ##################
 
+def decode_base64_to_buffer(encoding):
+    """
+    Decodes the payload of a base64 data url into an in-memory file. The header is parsed in place rather than by
+    splitting the url (which copies the payload), and the payload is decoded a chunk at a time into a buffer
+    preallocated to the decoded size, so the only full-size allocation is the buffer itself. Payloads with
+    characters outside the base64 alphabet (e.g. line breaks) are decoded in one piece, ignoring those characters.
+    """
+    start = encoding.index(",", encoding.index(";")) + 1
+    end = len(encoding)
+    length = end - start
+    if length % 4 or NON_BASE64_CHARACTERS.search(encoding, start, end):
+        return BytesIO(base64.b64decode(encoding[start:end]))
+    padding = 0
+    while padding < min(length, 2) and encoding[end - 1 - padding] == "=":
+        padding += 1
+    buffer = BytesIO()
+    size = length // 4 * 3 - padding
+    if size > 0:
+        buffer.seek(size - 1)
+        buffer.write(b"\0")
+        buffer.seek(0)
+    for chunk_start in range(start, end, BASE64_DECODE_CHUNK_SIZE):
+        buffer.write(binascii.a2b_base64(encoding[chunk_start:min(chunk_start + BASE64_DECODE_CHUNK_SIZE, end)]))
+    buffer.truncate()  # In case padding in the middle of the payload ended the decoded data early.
+    buffer.seek(0)
+    return buffer
+
+
 def decode_base64_to_binary(encoding):
-    inp = encoding.split(';')[1].split(',')[1]
-    return base64.b64decode(inp)
+    """
+    Returns the decoded payload of a base64 data url. `BytesIO.getvalue` returns the buffer's memory without copying
+    it when the buffer holds exactly its contents, as the buffer from `decode_base64_to_buffer` does.
+    """
+    return decode_base64_to_buffer(encoding).getvalue()
 
 
 def decode_base64_to_file(encoding):
@@ -79,6 +178,139 @@ def decode_base64_to_file(encoding):
     return file_obj
 
 
+def decode_base64_to_wav(encoding):
+    """
+    Reads a base64-encoded wav file in memory, without writing it to a temporary file.
+    :return: a (sample_rate, data) tuple.
+    """
+    with decode_base64_to_buffer(encoding) as wav_bytes:
+        return scipy.io.wavfile.read(wav_bytes)
+
+
+##################
+# FLAGGED FILES
+##################
+
+flagged_files_lock = threading.Lock()
+
+
+def get_extension_from_base64(encoding, default="bin"):
+    """
+    Returns the file extension implied by the mime type in the header of a base64 data url,
+    e.g. "png" for "data:image/png;base64,...".
+    """
+    mime_type = encoding[len("data:"):encoding.find(";")] if encoding.startswith("data:") else ""
+    if not mime_type:
+        return default
+    extension = mimetypes.guess_extension(mime_type)
+    if extension is None:
+        return mime_type.split("/")[-1]
+    return extension[1:]
+
+
+def save_base64_to_flagged_file(dir, encoding):
+    """
+    Stores a base64-encoded file in the flagging directory under the hash of its contents. The original bytes are
+    written as-is (no re-encoding), and if an identical file has already been flagged nothing is decoded or written,
+    so samples flagged with the same file share it.
+    :param dir: flagging directory to store the file in.
+    :param encoding: base64 data url of the file.
+    :return: name of the stored file, relative to `dir`.
+    """
+    payload = encoding[encoding.find(",") + 1:]
+    digest = hashlib.sha1(payload.encode("ascii")).hexdigest()
+    filename = "{}.{}".format(digest, get_extension_from_base64(encoding))
+    path = os.path.join(dir, filename)
+    with flagged_files_lock:
+        if not os.path.exists(path):
+            with tempfile.NamedTemporaryFile(dir=dir, delete=False) as file:
+                file.write(base64.b64decode(payload))
+            os.replace(file.name, path)  # Atomic, so a crash or another process can't leave a partial file.
+    return filename
+
+
+##################
+# THUMBNAILS
+##################
+
+THUMBNAIL_SIZE = (200, 200)
+WAVEFORM_PREVIEW_SIZE = (200, 60)
+
+
+def create_image_thumbnail(path, size=THUMBNAIL_SIZE):
+    """
+    Creates a thumbnail of an image file that fits within `size`. JPEG files are decoded directly at a reduced scale.
+    :return: a (bytes, mime type) tuple; JPEG, or PNG for images with transparency.
+    """
+    with Image.open(path) as img:
+        img.draft("RGB", size)
+        img.thumbnail(size)
+        if img.mode in ("RGBA", "LA", "P"):
+            format, mime_type = "PNG", "image/png"
+            img = img.convert("RGBA")
+        else:
+            format, mime_type = "JPEG", "image/jpeg"
+            img = img.convert("RGB")
+        with BytesIO() as output_bytes:
+            img.save(output_bytes, format=format)
+            return output_bytes.getvalue(), mime_type
+
+
+def create_waveform_preview(path, size=WAVEFORM_PREVIEW_SIZE):
+    """
+    Draws the waveform of a wav file as an image of `size`, with one vertical line per column spanning the minimum
+    and maximum of the samples in that column. The file is memory-mapped and each column is reduced in its stored
+    sample type, so the signal is never copied into memory as a whole.
+    :return: a (bytes, mime type) tuple of a PNG image.
+    """
+    width, height = size
+    _, signal = scipy.io.wavfile.read(path, mmap=True)
+    if signal.ndim > 1:
+        signal = signal[:, 0]
+    columns = np.array_split(signal, width) if len(signal) else []  # Views of the memory-mapped file.
+    envelope = np.zeros((width, 2), dtype=np.float32)
+    for i, column in enumerate(columns):
+        if len(column):
+            envelope[i] = float(column.min()), float(column.max())
+    envelope /= np.abs(envelope).max() + 1e-10
+    top = ((1 - envelope[:, 1]) * (height - 1) / 2).astype(int)
+    bottom = ((1 - envelope[:, 0]) * (height - 1) / 2).astype(int)
+    rows = np.arange(height)[:, np.newaxis]
+    image = np.where((rows >= top) & (rows <= bottom), 80, 255).astype(np.uint8)
+    with BytesIO() as output_bytes:
+        Image.fromarray(image, mode="L").save(output_bytes, format="PNG")
+        return output_bytes.getvalue(), "image/png"
+
+
+def get_thumbnail(path, cache_dir):
+    """
+    Returns the path of a cached thumbnail for an image file, or a waveform preview for a wav file, creating it in
+    `cache_dir` if needed. Thumbnails are named by a hash of the file's path, size and modification time, so they are
+    recreated when the file changes.
+    :return: the path of the thumbnail, or None if the file is not an image or wav file.
+    """
+    mime_type = mimetypes.guess_type(path)[0] or ""
+    if mime_type.startswith("image/"):
+        create_preview = create_image_thumbnail
+    elif mime_type in ("audio/wav", "audio/x-wav"):
+        create_preview = create_waveform_preview
+    else:
+        return None
+    stat = os.stat(path)
+    key = "{}:{}:{}".format(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    thumbnail_prefix = os.path.join(cache_dir, hashlib.sha1(key.encode("utf-8")).hexdigest())
+    for extension in (".jpg", ".png"):
+        if os.path.exists(thumbnail_prefix + extension):
+            return thumbnail_prefix + extension
+    data, thumbnail_mime_type = create_preview(path)
+    thumbnail_path = thumbnail_prefix + (".jpg" if thumbnail_mime_type == "image/jpeg" else ".png")
+    os.makedirs(cache_dir, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=cache_dir, delete=False) as thumbnail_file:
+        thumbnail_file.write(data)
+    os.replace(thumbnail_file.name, thumbnail_path)  # Atomic, in case the thumbnail is created concurrently.
+    return thumbnail_path
+
+
 ##################
 # AUDIO FILES
 ##################
@@ -0,0 +1,145 @@
+"""
+Defines a per-client token-bucket rate limiter and a fair-share scheduler, used by the server to keep a few clients
+(e.g. scripted clients or `live=True` interfaces left open) from monopolizing an interface.
+"""
+
+import collections
+import contextlib
+import threading
+import time
+
+MAX_TRACKED_CLIENTS = 10000  # Idle buckets are evicted once this many clients are being tracked.
+
+
+class RateLimitExceeded(Exception):
+    """
+    Raised when a client makes a request while its bucket is empty, or has too many requests waiting.
+    """
+    def __init__(self, retry_after):
+        self.retry_after = retry_after
+        super().__init__("Rate limit exceeded, retry after {:.2f}s".format(retry_after))
+
+
+class TokenBucket:
+    """
+    A bucket that holds up to `capacity` tokens and refills at `rate` tokens per second.
+    """
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_update = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_update) * self.rate)
+        self.last_update = now
+
+    def consume(self, tokens=1):
+        """
+        :return: seconds to wait until `tokens` are available; 0 if they were consumed.
+        """
+        self.refill()
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return 0
+        if self.rate <= 0:
+            return float("inf")
+        return (tokens - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """
+    Keeps one token bucket per (client, route) pair.
+    """
+    def __init__(self, limits):
+        """
+        Parameters:
+        limits (Dict[str, Tuple[float, int]]): maps a route name ("predict", "interpret", "predict_examples", "flag", ...) to a (rate, burst) tuple, where rate is the number of requests per second a client may sustain and burst is the number of requests it may make at once. Routes that are not listed are not limited.
+        """
+        self.limits = limits
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def check(self, client, route):
+        """
+        Consumes a token for `client` on `route`.
+        Raises:
+        RateLimitExceeded: if the client has no tokens left for the route.
+        """
+        if route not in self.limits:
+            return
+        rate, burst = self.limits[route]
+        with self.lock:
+            bucket = self.buckets.get((client, route))
+            if bucket is None:
+                if len(self.buckets) >= MAX_TRACKED_CLIENTS:
+                    self.evict_idle_buckets()
+                bucket = self.buckets[(client, route)] = TokenBucket(rate, burst)
+            retry_after = bucket.consume()
+        if retry_after > 0:
+            raise RateLimitExceeded(retry_after)
+
+    def evict_idle_buckets(self):
+        for key, bucket in list(self.buckets.items()):
+            bucket.refill()
+            if bucket.tokens >= bucket.capacity:  # A full bucket is indistinguishable from a new one.
+                del self.buckets[key]
+
+
+class FairScheduler:
+    """
+    Limits how many requests run at once. While all slots are busy, waiting requests are admitted round-robin across
+    clients, so a client with many requests queued only gets its share of the slots rather than all of them.
+    """
+    def __init__(self, max_concurrent, max_queued_per_client=None):
+        """
+        Parameters:
+        max_concurrent (int): number of requests that may run at the same time.
+        max_queued_per_client (int): if provided, a client with this many requests already waiting is rejected.
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queued_per_client = max_queued_per_client
+        self.active = 0
+        self.queues = collections.OrderedDict()  # Clients in round-robin order, each with a queue of tickets.
+        self.condition = threading.Condition()
+
+    def next_ticket(self):
+        for queue in self.queues.values():
+            return queue[0]
+
+    def queued(self, client=None):
+        with self.condition:
+            if client is not None:
+                return len(self.queues.get(client, ()))
+            return sum(len(queue) for queue in self.queues.values())
+
+    @contextlib.contextmanager
+    def slot(self, client):
+        """
+        Blocks until it is `client`'s turn to run, holding a slot for the duration of the `with` block.
+        Raises:
+        RateLimitExceeded: if the client already has `max_queued_per_client` requests waiting.
+        """
+        ticket = object()
+        with self.condition:
+            if self.max_queued_per_client is not None and \
+                    len(self.queues.get(client, ())) >= self.max_queued_per_client:
+                raise RateLimitExceeded(retry_after=1)
+            queue = self.queues.setdefault(client, collections.deque())
+            queue.append(ticket)
+            while self.active >= self.max_concurrent or self.next_ticket() is not ticket:
+                self.condition.wait()
+            queue.popleft()
+            if queue:
+                self.queues.move_to_end(client)
+            else:
+                del self.queues[client]
+            self.active += 1
+            self.condition.notify_all()  # The next client in line may be able to take a remaining slot.
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.active -= 1
+                self.condition.notify_all()
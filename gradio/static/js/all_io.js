@@ -38,17 +38,66 @@ var io_master_template = {
       this.target.find(".loading_failed").show();
     });
   },
+  reset_order: function() {
+    this.fetched_pages = new Set();
+    this.order_mapping = new Array(this.config.num_examples);
+  },
   score_similarity: function(callback) {
+    this.similarity_input = this.last_input;
+    this.reset_order();
+    this.fetch_examples_page(0, callback);
+  },
+  sort_examples: function(column, callback) {
+    this.similarity_input = null;
+    if (this.sort_column == column) {
+      this.sort_descending = !this.sort_descending;
+    } else {
+      this.sort_column = column;
+      this.sort_descending = false;
+    }
+    this.reset_order();
+    this.fetch_examples_page(0, callback);
+  },
+  fetch_examples_page: function(page, callback) {
+    // Pages of examples are fetched from the server as they are viewed, unless all examples are in the config and
+    // shown in their original order.
+    if (this.fetched_pages.has(page)) {
+      callback();
+      return;
+    }
+    let page_size = this.config.examples_per_page;
+    let page_start = page * page_size;
+    if (this.similarity_input == null && this.sort_column == null && this.config.examples) {
+      for (let i = page_start; i < page_start + page_size && i < this.config.num_examples; i++) {
+        this.order_mapping[i] = i;
+      }
+      this.fetched_pages.add(page);
+      callback();
+      return;
+    }
     this.target.find(".loading").removeClass("invisible");
     this.target.find(".loading_in_progress").show();
     this.target.find(".loading_failed").hide();
     this.target.find(".output_interfaces").css("opacity", 0.5);
 
-    this.fn(this.last_input, "score_similarity").then((output) => {
-      output = output["data"];
+    let request;
+    if (this.similarity_input != null) {
+      request = this.fn(this.similarity_input, "score_similarity", {"page": page, "page_size": page_size});
+    } else {
+      request = this.fn(null, "examples", {"page": page, "page_size": page_size, "sort": this.sort_column,
+                                           "descending": this.sort_descending});
+    }
+    request.then((output) => {
       this.target.find(".loading").addClass("invisible");
       this.target.find(".output_interfaces").css("opacity", 1);
-      this.order_mapping = sortWithIndices(output).reverse();
+      for (let [i, example_id] of output["example_ids"].entries()) {
+        this.order_mapping[page_start + i] = example_id;
+      }
+      Object.assign(this.examples, output["examples"]);
+      if (output["outputs"]) {
+        this.loaded_examples = Object.assign(this.loaded_examples || {}, output["outputs"]);
+      }
+      this.fetched_pages.add(page);
       callback();
     })
   },
@@ -76,21 +125,28 @@ var io_master_template = {
       callback(output)
     })
   },
-  submit_examples: function(callback) {
-    this.target.find(".loading").removeClass("invisible");
-    this.target.find(".loading_in_progress").show();
-    this.target.find(".loading_failed").hide();
-    this.target.find(".output_interfaces").css("opacity", 0.5);
-
+  submit_examples: function(page, callback) {
+    // Only the examples on the given (already fetched) page are run; the others are run when their page is viewed.
     let example_ids = [];
     if (this.loaded_examples == null) {
       this.loaded_examples = {};
     }
-    for (let i = 0; i < this.config.examples.length; i++) {
-      if (!(i in this.loaded_examples)) {
-        example_ids.push(i);
+    let page_start = page * this.config.examples_per_page;
+    let page_end = Math.min(page_start + this.config.examples_per_page, this.config.num_examples);
+    for (let example_id of this.order_mapping.slice(page_start, page_end)) {
+      if (example_id != null && !(example_id in this.loaded_examples)) {
+        example_ids.push(example_id);
       }
     }
+    if (example_ids.length == 0) {
+      callback();
+      return;
+    }
+    this.target.find(".loading").removeClass("invisible");
+    this.target.find(".loading_in_progress").show();
+    this.target.find(".loading_failed").hide();
+    this.target.find(".output_interfaces").css("opacity", 0.5);
+
     this.fn(example_ids, "predict_examples").then((output) => {
       this.target.find(".loading").addClass("invisible");
       this.target.find(".output_interfaces").css("opacity", 1);
@@ -153,11 +209,22 @@ var io_master_template = {
     this.target.find(".loading").removeClass("invisible");
     this.target.find(".loading_in_progress").show();
     var post_data = this.last_input;
-    this.fn(post_data, "interpret").then((data) => {
+    var show_interpretation = (data) => {
       for (let [idx, interpretation] of data["interpretation_scores"].entries()) {
-        io.input_interfaces[idx].show_interpretation(interpretation);
+        if (interpretation !== null) {  // Streamed results are null for inputs not interpreted yet.
+          io.input_interfaces[idx].show_interpretation(interpretation);
+        }
       }
-      io.alternative_outputs = data["alternative_outputs"]
+      io.alternative_outputs_id = data["alternative_outputs_id"];
+      io.alternative_outputs = {};  // Refined results may have outputs for more neighbors.
+    }
+    var request;
+    if (this.stream_fn) {
+      request = this.stream_fn(post_data, "interpret/stream", show_interpretation);
+    } else {
+      request = this.fn(post_data, "interpret").then(show_interpretation);
+    }
+    request.then(() => {
       io.target.find(".loading_in_progress").hide();
     }).catch((error) => {
       console.error(error);
@@ -166,13 +233,38 @@ var io_master_template = {
     })
   },
   alternative_interpret: function(interface_index, alternate_index) {
+    // Alternative outputs are fetched from the server on hover, and kept until the next interpretation.
+    var io = this;
+    this.hovered_alternate = interface_index === false ? null : interface_index + "," + alternate_index;
     if (interface_index === false) {
       this.output({"data": this.last_output});
-    } else if (io.alternative_outputs) {
-      this.output(
-        {"data": io.alternative_outputs[interface_index][alternate_index]},
-        /*do_not_cache=*/true
-      )
+    } else if (this.alternative_outputs_id) {
+      let key = this.hovered_alternate;
+      let show = (data) => {
+        if (data && io.hovered_alternate === key) {
+          io.output({"data": data}, /*do_not_cache=*/true);
+        }
+      };
+      if (key in this.alternative_outputs) {
+        show(this.alternative_outputs[key]);
+        return;
+      }
+      let outputs_id = this.alternative_outputs_id;
+      this.fn(null, "alternative_output", {
+        "id": outputs_id,
+        "input_index": interface_index,
+        "neighbor_index": alternate_index
+      }).then((data) => {
+        if (outputs_id === io.alternative_outputs_id) {
+          io.alternative_outputs[key] = data["data"];
+          show(data["data"]);
+        }
+      }).catch(() => {
+        // Shapley interpretation only has the outputs of the neighbors it evaluated, and the rest 404.
+        if (outputs_id === io.alternative_outputs_id) {
+          io.alternative_outputs[key] = null;
+        }
+      });
     }
   }
 };
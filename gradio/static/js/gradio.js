@@ -1,4 +1,4 @@
-function gradio(config, fn, target, example_file_path) {
+function gradio(config, fn, target, example_file_path, thumbnail_path) {
   target = $(target);
   target.html(`
     <div class="share invisible">
@@ -65,6 +65,7 @@ function gradio(config, fn, target, example_file_path) {
   io_master.target = target;
   io_master.config = config;
   io_master.example_file_path = example_file_path;
+  io_master.thumbnail_path = thumbnail_path || example_file_path;
 
   let input_to_object_map = {
     "csv" : {},
@@ -216,7 +217,7 @@ function gradio(config, fn, target, example_file_path) {
       target.find(".interpretation_explained .close_explain").click(function() {
         target.find(".interpretation_explained").remove();
       });
-      if (config["examples"]) {
+      if (config["num_examples"]) {
         target.find(".examples").removeClass("invisible");
         let html = "<thead>"
         for (let i = 0; i < config["input_interfaces"].length; i++) {
@@ -228,7 +229,7 @@ function gradio(config, fn, target, example_file_path) {
   }
   function load_example(example_id) {
     clear_all();
-    for (let [i, value] of config["examples"][example_id].entries()) {
+    for (let [i, value] of io_master.examples[example_id].entries()) {
       input_interfaces[i].load_example(value);
     };
     if (io_master.loaded_examples && example_id in io_master.loaded_examples) {
@@ -244,33 +245,48 @@ function gradio(config, fn, target, example_file_path) {
     $(".examples_body > tr[row='" + example_id + "'").addClass("current_example");
     io_master.current_example = example_id;
   }
+  function load_example_at(index) {
+    let page = Math.floor(index / config["examples_per_page"]);
+    io_master.fetch_examples_page(page, function() {
+      load_example(io_master.order_mapping[index]);
+    });
+  }
   function next_example() {
     current_example = io_master.current_example;
     if (current_example == null) {
       new_index = 0;
     } else {
-      new_index = (io_master.order_mapping.indexOf(current_example) + 1 + config.examples.length) % config.examples.length;
+      new_index = (io_master.order_mapping.indexOf(current_example) + 1 + config.num_examples) % config.num_examples;
     }
-    load_example(io_master.order_mapping[new_index]);
+    load_example_at(new_index);
   }
   function prev_example() {
     current_example = io_master.current_example;
     if (current_example == null) {
       new_index = 0;
     } else {
-      new_index = (io_master.order_mapping.indexOf(current_example) - 1 + config.examples.length) % config.examples.length;
+      new_index = (io_master.order_mapping.indexOf(current_example) - 1 + config.num_examples) % config.num_examples;
     }
-    load_example(io_master.order_mapping[new_index]);
+    load_example_at(new_index);
   }
   function load_page() {
+    io_master.fetch_examples_page(io_master.current_page, function() {
+      if (io_master.run_examples) {  // Once "run examples" is clicked, each page's examples are run as it is viewed.
+        io_master.submit_examples(io_master.current_page, render_page);
+      } else {
+        render_page();
+      }
+    });
+  }
+  function render_page() {
     page_num = io_master.current_page;
     target.find(".page").removeClass("primary");
     target.find(`.page[page=${page_num}]`).addClass("primary");
     let page_start = page_num * config["examples_per_page"]
     let html = "";
-    for (let i = page_start; i < page_start + config["examples_per_page"] && i < config.examples.length; i++) {
+    for (let i = page_start; i < page_start + config["examples_per_page"] && i < config.num_examples; i++) {
       let example_id = io_master.order_mapping[i];
-      let example = config["examples"][example_id];
+      let example = io_master.examples[example_id];
       html += "<tr row=" + example_id + ">";
       for (let [j, col] of example.entries()) {
         let new_col = JSON.parse(JSON.stringify(col))
@@ -294,19 +310,20 @@ function gradio(config, fn, target, example_file_path) {
     }
     target.find(".examples > table > tbody").html(html);
   }
-  if (config["examples"]) {
+  if (config["num_examples"]) {
     target.find(".examples").removeClass("invisible");
     let html = "<thead>"
     for (let i = 0; i < config["input_interfaces"].length; i++) {
       label = config["input_interfaces"][i][1]["label"];
-      html += "<th>" + label + "</th>";
+      html += "<th sort_column=" + i + ">" + label + "</th>";
     }
     html += "</thead>";
     html += "<tbody class='examples_body'></tbody>";
     target.find(".examples table").html(html);
     io_master.current_page = 0;
-    io_master.order_mapping = [...Array(config.examples.length).keys()];
-    let page_count = Math.ceil(config.examples.length / config.examples_per_page)
+    io_master.examples = Object.assign({}, config["examples"]);
+    io_master.reset_order();
+    let page_count = Math.ceil(config.num_examples / config.examples_per_page)
     if (page_count > 1) {
       target.find(".pages").removeClass("invisible");
       let html = "";
@@ -320,6 +337,13 @@ function gradio(config, fn, target, example_file_path) {
       let example_id = parseInt($(this).attr("row"));
       load_example(example_id);
     })
+    target.on("click", ".examples th[sort_column]", function() {
+      io_master.sort_examples(parseInt($(this).attr("sort_column")), function() {
+        io_master.current_page = 0;
+        io_master.current_example = null;
+        load_page();
+      });
+    })
     target.on("click", ".page", function() {
       let page_num = parseInt($(this).attr("page"));
       io_master.current_page = page_num;
@@ -509,9 +533,8 @@ function gradio(config, fn, target, example_file_path) {
       io_master.interpret();
     }
   });
-  target.find(".run_examples").click(function() {
+  function show_example_outputs() {
     if (!io_master.has_loaded_examples) {
-      this.has_loaded_examples = true;
       let html = ""
       for (let i = 0; i < io_master.output_interfaces.length; i++) {
         html += "<th>" + config.output_interfaces[i][1]["label"] + "</th>";
@@ -519,8 +542,17 @@ function gradio(config, fn, target, example_file_path) {
       target.find(".examples > table > thead > tr").append(html);
     }
     io_master.has_loaded_examples = true;
-    io_master.submit_examples(load_page);
-})
+  }
+  target.find(".run_examples").click(function() {
+    show_example_outputs();
+    io_master.run_examples = true;
+    load_page();
+  })
+  if (config["cached_examples"]) {
+    io_master.loaded_examples = Object.assign({}, config["cached_examples"]);
+    show_example_outputs();
+    load_page();
+  }
 
   $(".input_panel").on("mouseover", ".alternate", function() {
     let interface_index = $(this).closest(".interface").attr("interface_id");
@@ -533,19 +565,54 @@ function gradio(config, fn, target, example_file_path) {
 
   return io_master;
 }
-function gradio_url(config, url, target, example_file_path) {
-  return gradio(config, function(data, action) {
+function gradio_url(config, url, target, example_file_path, thumbnail_path) {
+  let io_master = gradio(config, function(data, action, options) {
     return new Promise((resolve, reject) => {
       $.ajax({type: "POST",
         url: url + action + "/",
-        data: JSON.stringify({"data": data}),
+        data: JSON.stringify(Object.assign({"data": data}, options)),
         dataType: 'json',
         contentType: 'application/json; charset=utf-8',
         success: resolve,
         error: reject,
       });
     });              
-  }, target, example_file_path);
+  }, target, example_file_path, thumbnail_path);
+  // Calls an endpoint that streams newline-delimited JSON, passing each object to on_message as it arrives.
+  io_master.stream_fn = function(data, action, on_message) {
+    return fetch(url + action + "/", {
+      method: "POST",
+      body: JSON.stringify({"data": data}),
+      headers: {"Content-Type": "application/json; charset=utf-8"},
+      credentials: "same-origin",
+    }).then((response) => {
+      if (!response.ok) {
+        throw new Error(response.status + " " + response.statusText);
+      }
+      let reader = response.body.getReader();
+      let decoder = new TextDecoder();
+      let buffer = "";
+      let read = () => reader.read().then(({done, value}) => {
+        buffer += decoder.decode(value || new Uint8Array(), {stream: !done});
+        let lines = buffer.split("\n");
+        buffer = lines.pop();
+        for (let line of lines) {
+          if (line.trim()) {
+            on_message(JSON.parse(line));
+          }
+        }
+        if (done) {
+          if (buffer.trim()) {
+            on_message(JSON.parse(buffer));
+          }
+          return;
+        }
+        return read();
+      });
+      return read();
+    });
+  };
+  return io_master;
 }
 function saveAs(uri, filename) {
   var link = document.createElement('a');
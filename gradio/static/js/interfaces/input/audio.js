@@ -137,6 +137,11 @@ const audio_input = {
       this.target.find(".upload_zone").mousedown();
     }
   },
+  load_example_preview: function(data) {
+    // Only wav files have a waveform preview; for other files, the thumbnail request fails and the name is shown.
+    return "<img src='"+this.io_master.thumbnail_path+data+"' height=50 alt='"+data+"' " +
+      "onerror='this.replaceWith(document.createTextNode(this.alt))'>"
+  },
   load_example: function(example_data) {
     example_data = this.io_master.example_file_path + example_data;
     let io = this;
@@ -248,7 +248,7 @@ const image_input = {
     }
   },
   load_example_preview: function(data) {
-    return "<img src='"+this.io_master.example_file_path+data+"' height=100>"
+    return "<img src='"+this.io_master.thumbnail_path+data+"' height=100>"
   },
   load_example: function(example_data) {
     example_data = this.io_master.example_file_path + example_data;
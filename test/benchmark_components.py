@@ -0,0 +1,399 @@
+"""
+Micro-benchmarks for the preprocessing, postprocessing, embedding and interpretation code of every input and output
+component (including the deprecated Sketchpad, Webcam and Microphone inputs; Dataframe.embed is not benchmarked as
+Dataframe doesn't support embeddings), plus the `processing_utils` encoders and decoders, at several payload sizes.
+Runs offline. Results are
+compared against the stored baselines in `test/benchmark_baseline.json`; any benchmark slower than its baseline by
+more than the threshold is reported as a regression (and the run exits with status 1). Run from the repository root:
+
+    python -m test.benchmark_components                    # compare against the baselines
+    python -m test.benchmark_components -k image           # only benchmarks whose name contains "image"
+    python -m test.benchmark_components --save-baseline    # record new baselines for this machine
+
+Baselines are machine-specific; re-record them on the machine the comparison runs on.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+import numpy as np
+import pandas as pd
+import scipy.io.wavfile
+from gradio import inputs, outputs, processing_utils
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "benchmark_baseline.json")
+DEFAULT_THRESHOLD = 1.5  # A benchmark regresses when its median time exceeds 1.5x its baseline...
+NOISE_FLOOR = 5e-5  # ...and by more than 50 microseconds, so timer noise on trivial benchmarks isn't reported.
+MIN_TIME = 0.2  # Seconds to spend measuring each benchmark (at least MIN_ROUNDS rounds are always run).
+MIN_ROUNDS = 3
+
+IMAGE_SIZES = {"256px": (256, 256), "1080p": (1920, 1080), "4k": (3840, 2160)}
+AUDIO_DURATIONS = {"1s": 1, "1min": 60, "10min": 600}
+AUDIO_SAMPLE_RATE = 16000
+DATAFRAME_ROWS = {"10rows": 10, "1krows": 1000, "100krows": 100000}
+TEXT_TOKENS = {"10tokens": 10, "1ktokens": 1000}
+
+BENCHMARKS = []
+
+
+def benchmark(name, sizes=None):
+    """
+    Registers a benchmark. The decorated function receives a size (one of the values of `sizes`) and returns a
+    zero-argument callable, the thing that gets timed; any setup happens before it returns.
+    """
+    def decorator(fn):
+        for size_name, size in (sizes or {"": None}).items():
+            full_name = name + ("[{}]".format(size_name) if size_name else "")
+            BENCHMARKS.append((full_name, fn, size))
+        return fn
+    return decorator
+
+
+def random_image(size):
+    width, height = size
+    return np.random.RandomState(0).randint(0, 256, (height, width, 3), dtype=np.uint8)
+
+
+def random_sketch(size):
+    width, height = size
+    sketch = np.zeros((height, width, 4), dtype=np.uint8)  # A transparent canvas with black strokes.
+    sketch[::8, :, 3] = 255
+    return sketch
+
+
+def random_audio(duration):
+    return np.random.RandomState(0).randint(-2 ** 15, 2 ** 15, duration * AUDIO_SAMPLE_RATE, dtype=np.int16)
+
+
+def encode_audio(data):
+    with tempfile.NamedTemporaryFile(suffix=".wav") as file:
+        scipy.io.wavfile.write(file.name, AUDIO_SAMPLE_RATE, data)
+        return processing_utils.encode_file_to_base64(file.name, type="audio")
+
+
+def random_table(rows, cols=5):
+    return np.random.RandomState(0).randint(0, 100, (rows, cols)).tolist()
+
+
+def random_text(tokens):
+    words = ["quick", "brown", "fox", "jumped", "over", "the", "lazy", "dog"]
+    return " ".join(words[i % len(words)] for i in range(tokens))
+
+
+##################
+# PROCESSING UTILS
+##################
+
+@benchmark("processing_utils.encode_array_to_base64", IMAGE_SIZES)
+def bench_encode_array(size):
+    image = random_image(size)
+    return lambda: processing_utils.encode_array_to_base64(image)
+
+
+@benchmark("processing_utils.decode_base64_to_image", IMAGE_SIZES)
+def bench_decode_image(size):
+    encoding = processing_utils.encode_array_to_base64(random_image(size))
+    return lambda: np.asarray(processing_utils.decode_base64_to_image(encoding))
+
+
+@benchmark("processing_utils.decode_base64_to_file", AUDIO_DURATIONS)
+def bench_decode_file(duration):
+    encoding = encode_audio(random_audio(duration))
+    return lambda: processing_utils.decode_base64_to_file(encoding).close()
+
+
+@benchmark("processing_utils.encode_file_to_base64", AUDIO_DURATIONS)
+def bench_encode_file(duration):
+    file = tempfile.NamedTemporaryFile(suffix=".wav")
+    scipy.io.wavfile.write(file.name, AUDIO_SAMPLE_RATE, random_audio(duration))
+    return lambda: (file, processing_utils.encode_file_to_base64(file.name, type="audio"))
+
+
+@benchmark("processing_utils.generate_mfcc_features_from_audio_file", AUDIO_DURATIONS)
+def bench_mfcc(duration):
+    signal = random_audio(duration)
+    return lambda: processing_utils.generate_mfcc_features_from_audio_file(
+        sample_rate=AUDIO_SAMPLE_RATE, signal=signal)
+
+
+##################
+# INPUTS
+##################
+
+@benchmark("inputs.Textbox.preprocess+embed", TEXT_TOKENS)
+def bench_textbox(tokens):
+    iface, text = inputs.Textbox(), random_text(tokens)
+    return lambda: iface.embed(iface.preprocess(text))
+
+
+@benchmark("inputs.Textbox.get_interpretation_neighbors", TEXT_TOKENS)
+def bench_textbox_interpretation(tokens):
+    iface, text = inputs.Textbox(), random_text(tokens)
+    return lambda: iface.get_interpretation_neighbors(text)
+
+
+@benchmark("inputs.Number.get_interpretation_neighbors+embed")
+def bench_number(_):
+    iface = inputs.Number()
+    return lambda: (iface.get_interpretation_neighbors(5.0), iface.embed(iface.preprocess(5.0)))
+
+
+@benchmark("inputs.Slider.get_interpretation_neighbors+embed")
+def bench_slider(_):
+    iface = inputs.Slider()
+    return lambda: (iface.get_interpretation_neighbors(5.0), iface.embed(iface.preprocess(5.0)))
+
+
+@benchmark("inputs.Checkbox.get_interpretation_neighbors+embed")
+def bench_checkbox(_):
+    iface = inputs.Checkbox()
+    return lambda: (iface.get_interpretation_neighbors(True), iface.embed(iface.preprocess(True)))
+
+
+CHOICES = {"10choices": 10, "1kchoices": 1000}
+
+
+@benchmark("inputs.CheckboxGroup.get_interpretation_neighbors+embed", CHOICES)
+def bench_checkbox_group(count):
+    choices = [str(i) for i in range(count)]
+    iface, x = inputs.CheckboxGroup(choices), choices[::2]
+    return lambda: (iface.get_interpretation_neighbors(x), iface.embed(iface.preprocess(x)))
+
+
+@benchmark("inputs.Radio.get_interpretation_neighbors+embed", CHOICES)
+def bench_radio(count):
+    choices = [str(i) for i in range(count)]
+    iface = inputs.Radio(choices)
+    return lambda: (iface.get_interpretation_neighbors(choices[0]), iface.embed(iface.preprocess(choices[0])))
+
+
+@benchmark("inputs.Dropdown.get_interpretation_neighbors+embed", CHOICES)
+def bench_dropdown(count):
+    choices = [str(i) for i in range(count)]
+    iface = inputs.Dropdown(choices)
+    return lambda: (iface.get_interpretation_neighbors(choices[0]), iface.embed(iface.preprocess(choices[0])))
+
+
+@benchmark("inputs.Image.preprocess", IMAGE_SIZES)
+def bench_image_preprocess(size):
+    iface, encoding = inputs.Image(), processing_utils.encode_array_to_base64(random_image(size))
+    return lambda: iface.preprocess(encoding)
+
+
+@benchmark("inputs.Image.embed", IMAGE_SIZES)
+def bench_image_embed(size):
+    iface = inputs.Image()
+    image = random_image(size)
+    return lambda: iface.embed(image)
+
+
+@benchmark("inputs.Image.get_interpretation_neighbors", {"256px": (256, 256), "1080p": (1920, 1080)})
+def bench_image_interpretation(size):
+    iface, encoding = inputs.Image(), processing_utils.encode_array_to_base64(random_image(size))
+    return lambda: iface.get_interpretation_neighbors(encoding)
+
+
+@benchmark("inputs.Audio.preprocess", AUDIO_DURATIONS)
+def bench_audio_preprocess(duration):
+    iface, encoding = inputs.Audio(), encode_audio(random_audio(duration))
+    return lambda: iface.preprocess(encoding)
+
+
+@benchmark("inputs.Audio.embed", AUDIO_DURATIONS)
+def bench_audio_embed(duration):
+    iface, x = inputs.Audio(), (AUDIO_SAMPLE_RATE, random_audio(duration))
+    return lambda: iface.embed(x)
+
+
+@benchmark("inputs.Audio.get_interpretation_neighbors", AUDIO_DURATIONS)
+def bench_audio_interpretation(duration):
+    iface, encoding = inputs.Audio(), encode_audio(random_audio(duration))
+    return lambda: iface.get_interpretation_neighbors(encoding)
+
+
+@benchmark("inputs.File.preprocess", AUDIO_DURATIONS)
+def bench_file_preprocess(duration):
+    iface = inputs.File()
+    x = {"name": "audio.wav", "data": encode_audio(random_audio(duration)), "is_local_example": False}
+    return lambda: iface.preprocess(x).close()
+
+
+@benchmark("inputs.Dataframe.preprocess", DATAFRAME_ROWS)
+def bench_dataframe_preprocess(rows):
+    iface, table = inputs.Dataframe(), random_table(rows)
+    return lambda: iface.preprocess(table)
+
+
+@benchmark("inputs.Dataframe.get_interpretation_neighbors", {"10rows": 10, "100rows": 100})
+def bench_dataframe_interpretation(rows):
+    iface, table = inputs.Dataframe(), random_table(rows)
+    return lambda: iface.get_interpretation_neighbors(table)
+
+
+@benchmark("inputs.Sketchpad.preprocess", {"256px": (256, 256), "1080p": (1920, 1080)})
+def bench_sketchpad_preprocess(size):
+    iface, encoding = inputs.Sketchpad(), processing_utils.encode_array_to_base64(random_sketch(size))
+    return lambda: iface.preprocess(encoding)
+
+
+@benchmark("inputs.Webcam.preprocess", IMAGE_SIZES)
+def bench_webcam_preprocess(size):
+    iface, encoding = inputs.Webcam(), processing_utils.encode_array_to_base64(random_image(size))
+    return lambda: iface.preprocess(encoding)
+
+
+@benchmark("inputs.Microphone.preprocess", AUDIO_DURATIONS)
+def bench_microphone_preprocess(duration):
+    iface, encoding = inputs.Microphone(), encode_audio(random_audio(duration))
+    return lambda: iface.preprocess(encoding)
+
+
+@benchmark("inputs.Microphone(mfcc).preprocess", {"1s": 1, "1min": 60})
+def bench_microphone_mfcc(duration):
+    iface, encoding = inputs.Microphone(preprocessing="mfcc"), encode_audio(random_audio(duration))
+    return lambda: iface.preprocess(encoding)
+
+
+##################
+# OUTPUTS
+##################
+
+@benchmark("outputs.Textbox.postprocess", TEXT_TOKENS)
+def bench_textbox_output(tokens):
+    iface, text = outputs.Textbox(), random_text(tokens)
+    return lambda: iface.postprocess(text)
+
+
+@benchmark("outputs.Label.postprocess", {"10classes": 10, "10kclasses": 10000})
+def bench_label(count):
+    iface = outputs.Label()
+    confidences = {str(i): float(c) for i, c in enumerate(np.random.RandomState(0).rand(count))}
+    return lambda: iface.postprocess(confidences)
+
+
+@benchmark("outputs.Image.postprocess", IMAGE_SIZES)
+def bench_image_output(size):
+    iface, image = outputs.Image(), random_image(size)
+    return lambda: iface.postprocess(image)
+
+
+@benchmark("outputs.KeyValues.postprocess", {"10keys": 10, "10kkeys": 10000})
+def bench_key_values(count):
+    iface, values = outputs.KeyValues(), {str(i): i for i in range(count)}
+    return lambda: iface.postprocess(values)
+
+
+@benchmark("outputs.HighlightedText.postprocess", TEXT_TOKENS)
+def bench_highlighted_text(tokens):
+    iface = outputs.HighlightedText()
+    spans = [(token, i % 2) for i, token in enumerate(random_text(tokens).split(" "))]
+    return lambda: iface.postprocess(spans)
+
+
+@benchmark("outputs.Audio.postprocess", AUDIO_DURATIONS)
+def bench_audio_output(duration):
+    iface, x = outputs.Audio(), (AUDIO_SAMPLE_RATE, random_audio(duration))
+    return lambda: iface.postprocess(x)
+
+
+@benchmark("outputs.JSON.postprocess", DATAFRAME_ROWS)
+def bench_json(rows):
+    iface, table = outputs.JSON(), random_table(rows)
+    return lambda: iface.postprocess(table)
+
+
+@benchmark("outputs.HTML.postprocess", TEXT_TOKENS)
+def bench_html(tokens):
+    iface, text = outputs.HTML(), "<p>" + random_text(tokens) + "</p>"
+    return lambda: iface.postprocess(text)
+
+
+@benchmark("outputs.File.postprocess", AUDIO_DURATIONS)
+def bench_file_output(duration):
+    iface = outputs.File()
+    file = tempfile.NamedTemporaryFile(suffix=".wav")
+    scipy.io.wavfile.write(file.name, AUDIO_SAMPLE_RATE, random_audio(duration))
+    return lambda: (file, iface.postprocess(file.name))
+
+
+@benchmark("outputs.Dataframe.postprocess", DATAFRAME_ROWS)
+def bench_dataframe_output(rows):
+    iface, df = outputs.Dataframe(), pd.DataFrame(random_table(rows))
+    return lambda: iface.postprocess(df)
+
+
+##################
+# RUNNER
+##################
+
+def measure(fn):
+    """
+    Times `fn` for at least MIN_ROUNDS rounds and MIN_TIME seconds.
+    Returns:
+    (Dict[str, float]): the median and minimum time per call in seconds, and the number of rounds.
+    """
+    times = []
+    start = time.perf_counter()
+    while len(times) < MIN_ROUNDS or time.perf_counter() - start < MIN_TIME:
+        call_start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - call_start)
+    return {"median": statistics.median(times), "min": min(times), "rounds": len(times)}
+
+
+def run(keyword=None):
+    results = {}
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for name, setup, size in BENCHMARKS:
+            if keyword is not None and keyword.lower() not in name.lower():
+                continue
+            results[name] = measure(setup(size))
+            print("{:<75}{:>12.6f}s ({} rounds)".format(name, results[name]["median"], results[name]["rounds"]))
+    return results
+
+
+def compare(results, baselines, threshold):
+    """
+    Returns the names of benchmarks whose median time exceeds `threshold` times their baseline median.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baselines:
+            continue
+        baseline = baselines[name]["median"]
+        if result["median"] > threshold * baseline and result["median"] - baseline > NOISE_FLOOR:
+            regressions.append(name)
+            print("REGRESSION {}: {:.6f}s vs. baseline {:.6f}s ({:.2f}x)".format(
+                name, result["median"], baseline, result["median"] / baseline))
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog="python -m test.benchmark_components",
+                                     description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument("-k", dest="keyword", help="only run benchmarks whose name contains this string")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baselines")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="slowdown factor over the baseline that counts as a regression")
+    args = parser.parse_args(args)
+    results = run(args.keyword)
+    baselines = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as baseline_file:
+            baselines = json.load(baseline_file)
+    if args.save_baseline:
+        baselines.update(results)
+        with open(BASELINE_PATH, "w") as baseline_file:
+            json.dump(baselines, baseline_file, indent=2, sort_keys=True)
+        return 0
+    return 1 if compare(results, baselines, args.threshold) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
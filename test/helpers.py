@@ -0,0 +1,15 @@
+import requests
+import time
+
+
+def wait_for_url(url):
+    """
+    Waits until the interface launched at `url` answers requests, as the server is started in a separate thread.
+    """
+    for _ in range(100):
+        try:
+            requests.get(url + "config/")
+            return
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    raise ConnectionError("Could not connect to interface.")
@@ -0,0 +1,49 @@
+import unittest
+import gradio as gr
+from test.helpers import wait_for_url
+from gradio import networking
+from gradio.client import Client, encode_input, decode_output
+import numpy as np
+import pandas as pd
+
+
+class TestEncoding(unittest.TestCase):
+    def test_image_round_trip(self):
+        array = np.zeros((10, 20, 3), dtype=np.uint8)
+        encoded = encode_input("image", array)
+        self.assertTrue(encoded.startswith("data:image/png;base64,"))
+        self.assertEqual(decode_output("image", encoded).size, (20, 10))
+
+    def test_audio_round_trip(self):
+        encoded = encode_input("audio", (8000, np.arange(100, dtype=np.int16)))
+        sample_rate, data = decode_output("audio", encoded)
+        self.assertEqual(sample_rate, 8000)
+        self.assertEqual(data.tolist(), list(range(100)))
+
+    def test_dataframe(self):
+        self.assertEqual(encode_input("dataframe", pd.DataFrame([[1, 2], [3, 4]])), [[1, 2], [3, 4]])
+        self.assertEqual(encode_input("dataframe", [1, 2]), [[1], [2]])
+
+    def test_label(self):
+        self.assertEqual(decode_output("label", {"label": "cat"}), "cat")
+        self.assertEqual(decode_output("label", {"label": "cat", "confidences": [
+            {"label": "cat", "confidence": 0.9}, {"label": "dog", "confidence": 0.1}]}), {"cat": 0.9, "dog": 0.1})
+
+
+class TestClient(unittest.TestCase):
+    def test_predict(self):
+        iface = gr.Interface(lambda img, text: (img.shape[0], text[::-1]), ["image", "text"], ["number", "text"],
+                             analytics_enabled=False)
+        networking.set_config(iface.get_config_file())
+        port, _, _ = networking.start_server(iface, networking.LOCALHOST_NAME)
+        url = "http://{}:{}/".format(networking.LOCALHOST_NAME, port)
+        wait_for_url(url)
+        with Client(url, max_in_flight=4) as client:
+            image = np.zeros((12, 8, 3), dtype=np.uint8)
+            self.assertEqual(client.predict(image, "abc"), [12, "cba"])
+            results = client.predict_batch([[image, str(i)] for i in range(10)])
+            self.assertEqual(results, [[12, str(i)] for i in range(10)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+import numpy as np
+from gradio.embeddings import EmbeddingIndex, IVFIndex
+import os
+import tempfile
+
+
+class TestIVFIndex(unittest.TestCase):
+    def setUp(self):
+        self.embeddings = np.random.RandomState(0).normal(size=(2000, 16))
+        self.query = self.embeddings[7] + 0.01
+
+    def test_top_k(self):
+        exact_ids, _ = EmbeddingIndex(self.embeddings).top_k(self.query, 10)
+        ids, scores = IVFIndex(self.embeddings, n_probe=10).top_k(self.query, 10)
+        self.assertEqual(ids[0], 7)
+        self.assertEqual(len(ids), 10)
+        self.assertTrue(np.all(np.diff(scores) <= 0))
+        self.assertGreaterEqual(len(set(ids) & set(exact_ids)), 8)
+
+    def test_more_results_than_probed(self):
+        index = IVFIndex(self.embeddings, n_lists=100, n_probe=1)
+        ids, _ = index.top_k(self.query, 500)
+        self.assertEqual(len(set(ids)), 500)
+
+    def test_pages_are_consistent(self):
+        index = IVFIndex(self.embeddings, n_lists=100, n_probe=2)
+        for page_size in [5, 40, 300]:
+            pages = [index.top_k(self.query, (page + 1) * page_size)[0][page * page_size:] for page in range(3)]
+            ids = np.concatenate(pages)
+            self.assertEqual(len(set(ids)), 3 * page_size)
+            np.testing.assert_array_equal(ids, index.top_k(self.query, 3 * page_size)[0])
+
+    def test_save_and_load(self):
+        index = IVFIndex(self.embeddings)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "index.npz")
+            index.save(path)
+            loaded = IVFIndex.load(path)
+        np.testing.assert_array_equal(loaded.assignments, index.assignments)
+        np.testing.assert_array_equal(loaded.top_k(self.query, 5)[0], index.top_k(self.query, 5)[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
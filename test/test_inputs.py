@@ -4,6 +4,10 @@ import PIL
 import numpy as np
 import scipy
 import os
+import tempfile
+import base64
+import tracemalloc
+from io import BytesIO
 
 class TestTextbox(unittest.TestCase):
     def test_in_interface(self):
@@ -84,7 +88,51 @@ class TestImage(unittest.TestCase):
             "image")
         output = iface.process([x_img])[0][0]
         self.assertEqual(gr.processing_utils.decode_base64_to_image(output).size, (10, 30))
-        
+
+    def test_rebuild(self):
+        x_img = gr.test_data.BASE64_IMAGE
+        image_input = gr.inputs.Image()
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filename = image_input.rebuild(tmpdirname, x_img)
+            self.assertEqual(image_input.rebuild(tmpdirname, x_img), filename)
+            self.assertTrue(filename.endswith(".gif"))
+            self.assertEqual(os.listdir(tmpdirname), [filename])
+
+    def test_interpretation_neighbors(self):
+        x_img = gr.test_data.BASE64_IMAGE
+        image_input = gr.inputs.Image(image_mode="L", shape=(25, 25))
+        neighbors, kwargs, _ = image_input.get_interpretation_neighbors(x_img)
+        self.assertIsInstance(neighbors[0], np.ndarray)
+        self.assertEqual(len(neighbors), len(kwargs["masks"]))
+        neighbor = image_input.preprocess_neighbor(neighbors[0])
+        self.assertEqual(neighbor.shape, (25, 25))
+        encoded_neighbor = image_input.preprocess(gr.processing_utils.encode_array_to_base64(neighbors[0]))
+        np.testing.assert_array_equal(neighbor, encoded_neighbor)
+
+    def test_draft_decoding(self):
+        image = np.random.RandomState(0).randint(0, 255, (64, 64, 3)).astype(np.uint8).repeat(16, 0).repeat(16, 1)
+        with BytesIO() as jpeg_bytes:
+            PIL.Image.fromarray(image).save(jpeg_bytes, "JPEG")
+            encoding = "data:image/jpeg;base64," + base64.b64encode(jpeg_bytes.getvalue()).decode("ascii")
+            self.assertEqual(gr.processing_utils.decode_base64_to_binary(encoding), jpeg_bytes.getvalue())
+        self.assertEqual(gr.processing_utils.decode_base64_to_image(encoding, target_size=(100, 100)).size,
+                         (128, 128))  # Decoded at 1/8 scale, the smallest that is still at least 100x100.
+        preprocessed = gr.inputs.Image(shape=(64, 64)).preprocess(encoding)
+        self.assertEqual(preprocessed.shape, (64, 64, 3))
+        self.assertLess(np.abs(preprocessed.astype(float) - image[8::16, 8::16]).mean(), 20)
+
+    def test_segmentation(self):
+        image = np.random.RandomState(0).randint(0, 255, (300, 200, 3)).astype(np.uint8)
+        image_input = gr.inputs.Image().interpret(segments=6, segmenter="grid")
+        labels = image_input.segment_image(image)
+        self.assertEqual(labels.shape, (300, 200))
+        self.assertEqual(len(np.unique(labels)), 6)
+        self.assertIs(image_input.segment_image(image.copy()), labels)  # Cached by the contents of the image.
+        image_input.interpret(segments=6, segmentation_size=32)
+        labels = image_input.segment_image(image)
+        self.assertEqual(labels.shape, (300, 200))  # Segmented at 32 pixels, and scaled back up.
+        self.assertGreater(len(np.unique(labels)), 1)
+
 
 class TestAudio(unittest.TestCase):
     def test_as_component(self):
@@ -106,6 +154,19 @@ class TestAudio(unittest.TestCase):
             "number")
         self.assertEqual(iface.process([x_wav])[0], [5239])
 
+    def test_interpretation_neighbors(self):
+        x_wav = gr.test_data.BASE64_AUDIO
+        audio_input = gr.inputs.Audio()
+        neighbors, _, _ = audio_input.get_interpretation_neighbors(x_wav)
+        self.assertEqual(len(neighbors), 8)
+        sample_rate, data = audio_input.preprocess_neighbor(neighbors[0])
+        self.assertEqual(sample_rate, 8000)
+        self.assertFalse(np.any(data[:1000]))
+        np.testing.assert_array_equal(data[1006:], audio_input.preprocess(x_wav)[1][1006:])
+        audio_input = gr.inputs.Audio(type="file")
+        file_obj = audio_input.preprocess_neighbor(neighbors[-1])
+        self.assertEqual(scipy.io.wavfile.read(file_obj.name)[1].shape, (8046,))
+
 class TestFile(unittest.TestCase):
     def test_in_interface(self):
         x_file = {
@@ -120,6 +181,26 @@ class TestFile(unittest.TestCase):
             get_size_of_file, "file", "number")
         self.assertEqual(iface.process([x_file])[0], [16362])
 
+    def test_wrapped_base64(self):
+        data = bytes(range(256)) * 3 + bytes(88)
+        wrapped = base64.encodebytes(data).decode("ascii")  # Line breaks every 76 characters.
+        self.assertEqual(len(wrapped) % 4, 0)
+        x_file = {"name": "file.bin", "data": "data:application/octet-stream;base64," + wrapped,
+                  "is_local_example": False}
+        self.assertEqual(gr.inputs.File(type="bytes").preprocess(x_file), data)
+
+    def test_decode_without_copy(self):
+        data = os.urandom(1 << 22)
+        encoding = "data:application/octet-stream;base64," + base64.b64encode(data).decode("ascii")
+        tracemalloc.start()
+        try:
+            decoded = gr.processing_utils.decode_base64_to_binary(encoding)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(decoded, data)
+        self.assertLess(peak, 1.5 * len(data))  # The decoded bytes, and no second full-size copy.
+
 
 class TestDataframe(unittest.TestCase):
     def test_as_component(self):
@@ -140,6 +221,33 @@ class TestDataframe(unittest.TestCase):
         iface = gr.Interface(get_last, "list", "text")
         self.assertEqual(iface.process([x_data])[0], ["Sal"])
 
+    def test_interpretation(self):
+        x_data = [[1, 2, 3], [4, 5, 6]]
+        iface = gr.Interface(np.sum, "numpy", "number", interpretation="default")
+        scores = iface.interpret([x_data])[0][0]
+        self.assertEqual(scores, [[1, 2, 3], [4, 5, 6]])
+
+        dataframe_input = gr.inputs.Dataframe(type="numpy").interpret(mode="row")
+        iface = gr.Interface(np.sum, dataframe_input, "number", interpretation="default")
+        self.assertEqual(iface.interpret([x_data])[0][0], [[6, 6, 6], [15, 15, 15]])
+
+        dataframe_input = gr.inputs.Dataframe(type="numpy").interpret(mode="column", max_evaluations=2)
+        neighbors, _, _ = dataframe_input.get_interpretation_neighbors(x_data)
+        self.assertEqual(len(neighbors), 2)
+        iface = gr.Interface(np.sum, dataframe_input, "number", interpretation="default")
+        scores = np.array(iface.interpret([x_data])[0][0])
+        self.assertEqual(np.count_nonzero(scores.sum(axis=0)), 2)
+
+    def test_interpretation_neighbors(self):
+        x_data = [["Tim", 12, False], ["Jan", 24, True]]
+        dataframe_input = gr.inputs.Dataframe(headers=["Name", "Age", "Member"])
+        neighbors, kwargs, _ = dataframe_input.get_interpretation_neighbors(x_data)
+        self.assertEqual(len(neighbors), 6)
+        self.assertEqual(kwargs["shape"], (2, 3))
+        self.assertEqual(dataframe_input.preprocess_neighbor(neighbors[0])["Name"][0], "")
+        self.assertEqual(dataframe_input.preprocess_neighbor(neighbors[4])["Age"][1], 0)
+        self.assertEqual(dataframe_input.preprocess_neighbor(neighbors[5])["Member"][1], False)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -1,4 +1,170 @@
 import unittest
+import gradio as gr
+import os
+import json
+import tempfile
+import numpy as np
+
+
+class TestCacheExamples(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmpdir.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmpdir.cleanup()
+
+    def test_cache_examples(self):
+        calls = []
+
+        def reverse(text):
+            calls.append(text)
+            if text == "error":
+                raise ValueError()
+            return text[::-1]
+
+        examples = [["abc"], ["error"], ["hello"]]
+        iface = gr.Interface(reverse, "textbox", "textbox", examples=examples, cache_examples=True,
+                             analytics_enabled=False)
+        iface.cache_example_outputs()
+        self.assertEqual(iface.get_config_file()["cached_examples"], {0: ["cba"], 2: ["olleh"]})
+        self.assertEqual(len(calls), 3)
+
+        iface = gr.Interface(reverse, "textbox", "textbox", examples=examples, cache_examples=True,
+                             analytics_enabled=False)
+        iface.cache_example_outputs()
+        self.assertEqual(iface.cached_examples, {0: ["cba"], 2: ["olleh"]})
+        self.assertEqual(calls[3:], ["error"])  # Loaded from disk; only the failed example is run again.
+
+        iface = gr.Interface(reverse, "textbox", "textbox", examples=[["xyz"]], cache_examples=True,
+                             analytics_enabled=False)
+        self.assertEqual(iface.cache_example_outputs(), {0: ["zyx"]})
+
+    def test_unserializable_outputs_and_unreadable_cache(self):
+        def count(text):
+            return np.int64(len(text)) if text == "numpy" else len(text)
+
+        iface = gr.Interface(count, "textbox", "json", examples=[["abc"], ["numpy"]], analytics_enabled=False)
+        self.assertEqual(iface.cache_example_outputs(), {0: [3]})
+        with open(iface.get_examples_cache_path()) as cache_file:
+            self.assertEqual(json.load(cache_file), {"0": [3]})
+        with open(iface.get_examples_cache_path(), "w") as cache_file:
+            cache_file.write('{"0": [')
+        self.assertEqual(iface.cache_example_outputs(), {0: [3]})
+        self.assertEqual(os.listdir(gr.interface.CACHED_EXAMPLES_DIR), [os.path.basename(
+            iface.get_examples_cache_path())])
+
+    def test_no_cache_without_source(self):
+        fn = eval("lambda text: text[::-1]")
+        iface = gr.Interface(fn, "textbox", "textbox", examples=[["abc"]], analytics_enabled=False)
+        self.assertIsNone(iface.get_examples_cache_path())
+        self.assertEqual(iface.cache_example_outputs(), {0: ["cba"]})
+        self.assertFalse(os.path.exists(gr.interface.CACHED_EXAMPLES_DIR))
+
+    def test_cache_path_depends_on_components(self):
+        paths = set()
+        for output in [gr.outputs.Label(), gr.outputs.Label(num_top_classes=3), gr.outputs.Image(format="jpeg")]:
+            iface = gr.Interface(lambda x: x, "textbox", output, examples=[["a"]], analytics_enabled=False)
+            paths.add(iface.get_examples_cache_path())
+        self.assertEqual(len(paths), 3)
+
+
+class TestExampleSimilarity(unittest.TestCase):
+    def test_score_similarity(self):
+        calls = []
+
+        def embedding(x):
+            calls.append(x)
+            return [float(x), 1.0]
+
+        iface = gr.Interface(lambda x: x, "number", "number", examples=[[1], [-1], [3]], embedding=embedding,
+                             analytics_enabled=False)
+        example_ids, scores = iface.score_similarity([1])
+        self.assertEqual(example_ids, [0, 1, 2])
+        self.assertAlmostEqual(scores[0], 1, places=5)
+        self.assertAlmostEqual(scores[1], 0, places=5)
+        example_ids, scores = iface.score_similarity([2], k=2)
+        self.assertEqual(example_ids, [2, 0])
+        self.assertGreater(scores[0], scores[1])
+        self.assertEqual(len(calls), 5)  # Examples are embedded once, then only the queries.
+
+        iface.examples = [[-2]]
+        example_ids, scores = iface.score_similarity([-2])
+        self.assertEqual(example_ids, [0])
+        self.assertAlmostEqual(scores[0], 1, places=5)
+
+    def test_ann_index(self):
+        cwd, threshold = os.getcwd(), gr.interface.ANN_INDEX_MIN_EXAMPLES
+        with tempfile.TemporaryDirectory() as tmpdir:
+            os.chdir(tmpdir)
+            gr.interface.ANN_INDEX_MIN_EXAMPLES = 2
+            try:
+                examples = [[x] for x in range(-10, 10)]
+                iface = gr.Interface(lambda x: x, "number", "number", examples=examples,
+                                     embedding=lambda x: [x, 1], analytics_enabled=False)
+                example_ids, _ = iface.score_similarity([5], k=3)
+                self.assertIsInstance(iface.example_embedding_index, gr.embeddings.IVFIndex)
+                self.assertEqual(len(example_ids), 3)
+                self.assertEqual(len(os.listdir(gr.interface.CACHED_EXAMPLES_DIR)), 1)
+            finally:
+                gr.interface.ANN_INDEX_MIN_EXAMPLES = threshold
+                os.chdir(cwd)
+
+
+class TestExamplesFromPath(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmpdir.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmpdir.cleanup()
+
+    def test_csv(self):
+        os.mkdir("examples")
+        for name in ["image.png", "notes.txt"]:
+            with open(os.path.join("examples", name), "wb") as f:
+                f.write(b"data")
+        path = os.path.join(self.tmpdir.name, "examples", "log.csv")
+        with open(path, "w") as f:
+            f.write("text,number,image,output\nnotes.txt,4.5,image.png,x\nabc,2,missing.png,y\n")
+        iface = gr.Interface(lambda x, y, z: x, ["textbox", "number", "image"], "textbox", examples=path,
+                             analytics_enabled=False)
+        self.assertEqual(iface.examples, [["notes.txt", 4.5, os.path.join("examples", "image.png")],
+                                          ["abc", 2, "missing.png"]])
+        iface = gr.Interface(lambda x, y, z: x, ["textbox", "number", "image"], "textbox",
+                             examples="examples", analytics_enabled=False)
+        self.assertEqual(len(iface.examples), 2)
+
+    def test_directory(self):
+        os.mkdir("examples")
+        for name in ["b.txt", "a.txt"]:
+            with open(os.path.join("examples", name), "w") as f:
+                f.write(name)
+        iface = gr.Interface(lambda x: x, "file", "textbox", examples=os.path.join(self.tmpdir.name, "examples"),
+                             analytics_enabled=False)
+        self.assertEqual(iface.examples, [[os.path.join("examples", "a.txt")], [os.path.join("examples", "b.txt")]])
+
+    def test_directory_outside_working_directory(self):
+        with open("a.txt", "w") as f:
+            f.write("a")
+        os.mkdir("app")
+        os.chdir("app")
+        with self.assertWarns(UserWarning):
+            iface = gr.Interface(lambda x: x, "file", "textbox", examples=self.tmpdir.name, analytics_enabled=False)
+        self.assertEqual(iface.examples, [[os.path.join(os.path.realpath(self.tmpdir.name), "a.txt")]])  # Not app/.
+
+    def test_config_is_paginated(self):
+        iface = gr.Interface(lambda x: x, "number", "number", examples=[[x] for x in range(500)],
+                             analytics_enabled=False)
+        config = iface.get_config_file()
+        self.assertEqual(config["num_examples"], 500)
+        self.assertNotIn("examples", config)
+        self.assertEqual(iface.get_sorted_example_ids(0, descending=True)[:2], [499, 498])
+
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
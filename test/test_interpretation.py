@@ -1,9 +1,15 @@
 import unittest
+import gradio.interface
 import gradio.interpretation
 import gradio.test_data
 from gradio.processing_utils import decode_base64_to_image, encode_array_to_base64
 from gradio import Interface
+import gradio as gr
 import numpy as np
+import os
+import tempfile
+import threading
+import time
 
 
 class TestDefault(unittest.TestCase):
@@ -22,7 +28,235 @@ class TestDefault(unittest.TestCase):
         img = encode_array_to_base64(array)        
         interpretation = img_interface.interpret([img])[0][0]
         self.assertGreater(interpretation[0][0], 0)  # Checks to see if the top-left has >0 score.
-        
+
+    def test_default_preprocesses_unperturbed_inputs_once(self):
+        image_input = gr.inputs.Image()
+        preprocess_calls = []
+        preprocess = image_input.preprocess
+        image_input.preprocess = lambda x: preprocess_calls.append(x) or preprocess(x)
+        fn = lambda text, img: len(text) + int(img.max() > 0)
+        interface = Interface(fn, ["textbox", image_input], "number", interpretation="default")
+        img = encode_array_to_base64(np.zeros((10, 10, 3), dtype=np.uint8))
+        interpretation = interface.interpret(["one two three four", img])[0]
+        self.assertEqual(len(interpretation[0]), 8)
+        self.assertEqual(len(preprocess_calls), 1)  # Image neighbors skip preprocess, and token neighbors reuse it.
+
+
+class TestHierarchicalText(unittest.TestCase):
+    def test_hierarchical_text(self):
+        calls = []
+
+        def contains_fox(text):
+            calls.append(text)
+            return int("fox" in text)
+
+        text = "the quick brown fox jumped. over the lazy dog, and then slept in the sun all day long."
+        textbox = gr.inputs.Textbox().interpret(mode="hierarchical")
+        text_interface = Interface(contains_fox, textbox, "number", interpretation="default")
+        interpretation, alternative_outputs = text_interface.interpret([text])
+        scores = dict(interpretation[0])
+        self.assertEqual(scores["fox"], 1)
+        self.assertEqual(sum(score for _, score in interpretation[0]), 1)
+        self.assertEqual(len(alternative_outputs[0]), len(text.split(" ")))
+        self.assertLess(len(calls), len(text.split(" ")))
+
+        calls.clear()
+        textbox = gr.inputs.Textbox().interpret(mode="hierarchical", max_calls=3)
+        text_interface = Interface(contains_fox, textbox, "number", interpretation="default")
+        interpretation = text_interface.interpret([text])[0][0]
+        self.assertLessEqual(len(calls), 4)  # The budget, plus the prediction on the original input.
+        self.assertEqual(dict(interpretation)["slept"], 0)
+
+
+class TestShapley(unittest.TestCase):
+    def test_sample_coalitions(self):
+        coalitions, weights = gradio.interpretation.sample_coalitions(4, 100)
+        self.assertEqual(len(coalitions), 15)  # Every coalition but the full one, when the budget allows.
+        self.assertFalse(coalitions[0].any())
+        self.assertTrue((coalitions[1:5].sum(axis=1) == 3).all())  # Single features are removed first.
+        coalitions, _ = gradio.interpretation.sample_coalitions(30, 50)
+        self.assertEqual(len(coalitions), 50)
+
+    def test_shapley_text(self):
+        def score(text):
+            words = text.split(" ")
+            return 2 * ("a" in words) + ("b" in words and "c" in words)
+
+        text_interface = Interface(score, "textbox", "number", interpretation="shapley")
+        interpretation = dict(text_interface.interpret(["a b c d"])[0][0])
+        for token, expected in (("a", 2), ("b", 0.5), ("c", 0.5), ("d", 0)):
+            self.assertAlmostEqual(interpretation[token], expected)
+
+    def test_shapley_budget(self):
+        calls = []
+
+        def count_words(text):
+            calls.append(text)
+            return len(text.split(" "))
+
+        text_interface = Interface(count_words, "textbox", "number", interpretation="shapley",
+                                   interpretation_budget=20)
+        text = " ".join("word{}".format(i) for i in range(40))
+        interpretation, alternative_outputs = text_interface.interpret([text])
+        self.assertLessEqual(len(calls), 21)  # The budget, plus the prediction on the original input.
+        self.assertEqual(len(interpretation[0]), 80)
+        self.assertEqual(len(alternative_outputs[0]), 40)
+
+    def test_shapley_dataframe(self):
+        dataframe_interface = Interface(lambda df: float(df.values.astype(float).sum()),
+                                        gr.inputs.Dataframe(type="pandas", datatype="number"), "number",
+                                        interpretation="shapley")
+        interpretation = dataframe_interface.interpret([[[1, 2, 3], [4, 5, 6], [0, 0, 0]]])[0][0]
+        np.testing.assert_allclose(interpretation, [[1, 2, 3], [4, 5, 6], [0, 0, 0]], atol=1e-6)
+
+    def test_shapley_fallback(self):
+        number_interface = Interface(lambda x: x ** 2, "number", "number", interpretation="shapley")
+        interpretation = number_interface.interpret([3])[0][0]
+        self.assertEqual(len(interpretation), 7)  # Numbers are interpreted by the default interpreter.
+
+
+class TestProgressive(unittest.TestCase):
+    def test_shapley_stages(self):
+        calls = []
+
+        def score(text):
+            calls.append(text)
+            return 2 * ("a" in text.split(" "))
+
+        text_interface = Interface(score, "textbox", "number", interpretation="shapley")
+        stages = list(text_interface.interpret_progressively(["a b c d"]))
+        self.assertEqual(len(stages), 2)  # A leave-one-out estimate first, then the refined one.
+        self.assertAlmostEqual(dict(stages[-1][0][0])["a"], 2)
+        self.assertEqual(len(calls), len(set(calls)))  # Coalitions of the coarse stage are not evaluated again.
+
+    def test_cache(self):
+        calls = []
+
+        def score(text):
+            calls.append(text)
+            return len(text)
+
+        text_interface = Interface(score, "textbox", "number", interpretation="default")
+        interpretation = text_interface.interpret(["quick brown fox"])
+        num_calls = len(calls)
+        self.assertEqual(text_interface.interpret(["quick brown fox"]), interpretation)
+        self.assertEqual(len(calls), num_calls)
+        text_interface.input_interfaces[0].interpret(separator="o")  # Different settings are not cached.
+        text_interface.interpret(["quick brown fox"])
+        self.assertGreater(len(calls), num_calls)
+
+    def test_cache_hit_does_not_block(self):
+        text_interface = Interface(len, "textbox", "number", interpretation="default")
+        text_interface.interpret(["quick brown fox"])
+        paused = text_interface.interpret_progressively(["quick brown fox"])
+        next(paused)  # A slow client leaves the generator paused at the cached result.
+        thread = threading.Thread(target=text_interface.interpret, args=(["quick brown fox"],))
+        thread.start()
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive())
+        paused.close()
+
+    def test_no_result(self):
+        text_interface = Interface(len, "textbox", "number", interpretation="default")
+        text_interface.interpret_progressively = lambda raw_input: iter([])
+        with self.assertRaises(ValueError):
+            text_interface.interpret(["quick brown fox"])
+
+    def test_stored_outputs_bounded_by_size(self):
+        image_interface = Interface(lambda x: x, "image", "image")
+        original_limit = gradio.interface.MAX_STORED_ALTERNATIVE_OUTPUTS_BYTES
+        gradio.interface.MAX_STORED_ALTERNATIVE_OUTPUTS_BYTES = 1600
+        try:
+            first = image_interface.store_alternative_outputs([[[np.zeros((10, 10, 3), dtype=np.uint8)]]])
+            second = image_interface.store_alternative_outputs([[[np.zeros((20, 20, 3), dtype=np.uint8)]]])
+        finally:
+            gradio.interface.MAX_STORED_ALTERNATIVE_OUTPUTS_BYTES = original_limit
+        self.assertIsNone(image_interface.get_alternative_output(first, 0, 0))
+        self.assertIsNotNone(image_interface.get_alternative_output(second, 0, 0))
+        self.assertIsNone(image_interface.get_alternative_output(second, 0, -1))
+
+
+class TestBatched(unittest.TestCase):
+    def test_batched_text(self):
+        batch_sizes = []
+
+        def max_word_lens(texts):
+            batch_sizes.append(len(texts))
+            return [max([len(word) for word in text.split(" ")]) for text in texts]
+
+        text_interface = Interface(max_word_lens, "textbox", "label", interpretation="default", batch=True,
+                                   max_batch_size=2)
+        interpretation = text_interface.interpret(["quickest brown fox"])[0][0]
+        self.assertGreater(interpretation[0][1], 0)
+        self.assertEqual(interpretation[-1][1], 0)
+        self.assertEqual(batch_sizes, [1, 2, 1])  # The original input, then the 3 neighbors in chunks of 2.
+
+    def test_batched_multiple_outputs(self):
+        def lengths(texts):
+            return [len(text) for text in texts], [text.upper() for text in texts]
+
+        iface = Interface(lengths, "textbox", ["number", "textbox"], batch=True)
+        self.assertEqual(iface.process(["abc"])[0], [3, "ABC"])
+        self.assertEqual(iface.run_batch_prediction([["a"], ["bc"]]), [[1, "A"], [2, "BC"]])
+
+
+class TestParallel(unittest.TestCase):
+    def test_parallel_text(self):
+        lock = threading.Lock()
+        in_flight, max_in_flight = [0], [0]
+
+        def max_word_len(text):
+            with lock:
+                in_flight[0] += 1
+                max_in_flight[0] = max(max_in_flight[0], in_flight[0])
+            time.sleep(0.05)
+            with lock:
+                in_flight[0] -= 1
+            return max([len(word) for word in text.split(" ")])
+
+        text_interface = Interface(max_word_len, "textbox", "label", interpretation="default",
+                                   interpretation_workers=4, max_interpretation_workers_per_request=2)
+        interpretation = text_interface.interpret(["the quickest brown fox jumps"])[0][0]
+        scores = dict(interpretation)
+        self.assertGreater(scores["quickest"], 0)
+        self.assertEqual(scores["fox"], 0)
+        self.assertEqual(max_in_flight[0], 2)
+
+    def test_inputs_not_shared_between_neighbors(self):
+        def count(text, choices):
+            choices.append("extra")  # Modifies the input in place.
+            return len(text) + len(choices)
+
+        def count_without_modifying(text, choices):
+            return len(text) + len(choices) + 1
+
+        interpretations = []
+        for fn in (count, count_without_modifying):
+            iface = Interface(fn, ["textbox", gr.inputs.CheckboxGroup(["a", "b", "c"])], "number",
+                              interpretation="default", interpretation_workers=4)
+            interpretations.append(iface.interpret(["quick brown fox", ["a", "b"]])[0])
+        self.assertEqual(interpretations[0], interpretations[1])
+
+    def test_copied_files_closed(self):
+        files = []
+
+        def read(text, file):
+            files.append(file)
+            return len(text) + len(file.read())
+
+        iface = Interface(read, ["textbox", "file"], "number", interpretation="default", interpretation_workers=2)
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as original:
+            original.write("hello")
+        try:
+            with open(original.name) as file:
+                neighbor_values = iface.input_interfaces[0].get_interpretation_neighbors("quick brown fox")[0]
+                predictions = iface.predict_interpretation_neighbors(["quick brown fox", file], 0, neighbor_values)
+                self.assertEqual([prediction[0] for prediction in predictions], [14, 14, 16])
+                self.assertTrue(all(copy.closed for copy in files))
+                self.assertNotIn(file, files)
+        finally:
+            os.remove(original.name)
+
 
 class TestCustom(unittest.TestCase):
     def test_custom_text(self):
@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+import gradio as gr
+from test.helpers import wait_for_url
+from gradio import networking, loadtest
+
+
+class TestPayloads(unittest.TestCase):
+    def test_synthesize_from_config(self):
+        iface = gr.Interface(lambda *args: 0, ["image", "slider", gr.inputs.Radio(["a", "b"]), "dataframe"],
+                             "number", analytics_enabled=False)
+        payload = loadtest.build_payloads(None, None, iface.get_config_file())[0]
+        self.assertEqual(payload, [iface.input_interfaces[0].test_input, 0, "a",
+                                   iface.input_interfaces[3].test_input])
+
+    def test_unsupported_component(self):
+        iface = gr.Interface(lambda x: 0, "file", "number", analytics_enabled=False)
+        with self.assertRaises(ValueError):
+            loadtest.build_payloads(None, None, iface.get_config_file())
+
+    def test_file_examples_outside_cwd(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "example.txt")
+            with open(path, "w") as f:
+                f.write("hello")
+            config = {"input_interfaces": [("file", {})],
+                      "examples": [[path], [os.path.join(tmpdir, "missing.txt")]]}
+            payloads = loadtest.build_payloads(None, None, config)
+        self.assertEqual(payloads, [[{"name": "example.txt", "data": "data:text/plain;base64,aGVsbG8=",
+                                      "is_local_example": False}]])
+
+
+class TestLoadTest(unittest.TestCase):
+    def test_run(self):
+        iface = gr.Interface(lambda x: x[::-1], "textbox", "textbox", analytics_enabled=False)
+        networking.set_config(iface.get_config_file())
+        port, _, _ = networking.start_server(iface, networking.LOCALHOST_NAME)
+        url = "http://{}:{}/".format(networking.LOCALHOST_NAME, port)
+        wait_for_url(url)
+        results = loadtest.run_load_test(url,
+                                          endpoints=["predict", "interpret"], concurrency_levels=[1, 2],
+                                          duration=0.5)
+        self.assertEqual([(r["endpoint"], r["concurrency"]) for r in results], [("predict", 1), ("predict", 2)])
+        self.assertGreater(results[0]["requests"], 0)
+        self.assertEqual(results[0]["error_rate"], 0)
+        self.assertIn("predict", loadtest.format_report(results))
+
+
+if __name__ == '__main__':
+    unittest.main()
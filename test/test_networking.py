@@ -0,0 +1,227 @@
+import unittest
+import gradio as gr
+from gradio import networking
+from gradio.rate_limiting import RateLimiter, FairScheduler
+import json
+import os
+import tempfile
+from io import BytesIO
+import numpy as np
+import scipy.io.wavfile
+from PIL import Image
+from werkzeug.test import Client
+
+
+class TestFileRoute(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.tmpdir.name, "example.txt"), "wb") as f:
+            f.write(b"0123456789")
+        with open(os.path.join(self.tmpdir.name, "other.txt"), "wb") as f:
+            f.write(b"abcdef")
+        networking.app.cwd = self.tmpdir.name
+        networking.app.interface = gr.Interface(
+            lambda x: x, "textbox", "textbox", examples=[["example.txt"]], analytics_enabled=False)
+        networking.app.example_files = networking.get_example_files(networking.app.interface)
+        self.client = networking.app.test_client()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_conditional_get(self):
+        response = self.client.get("/file/other.txt")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, b"abcdef")
+        etag = response.headers["ETag"]
+        response = self.client.get("/file/other.txt", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+    def test_range(self):
+        response = self.client.get("/file/example.txt", headers={"Range": "bytes=2-5"})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.data, b"2345")
+        self.assertEqual(response.headers["Content-Range"], "bytes 2-5/10")
+
+    def test_example_cache_headers(self):
+        response = self.client.get("/file/example.txt")
+        self.assertIn("no-cache", response.headers["Cache-Control"])
+        self.assertNotIn("immutable", response.headers["Cache-Control"])
+        etag = response.headers["ETag"]
+        with open(os.path.join(self.tmpdir.name, "example.txt"), "wb") as f:
+            f.write(b"edited")
+        os.utime(os.path.join(self.tmpdir.name, "example.txt"), (0, 0))
+        response = self.client.get("/file/example.txt", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, b"edited")
+
+    def test_outside_directory(self):
+        response = self.client.get("/file/../secret.txt")
+        self.assertEqual(response.status_code, 404)
+
+
+class TestScoreSimilarity(unittest.TestCase):
+    def setUp(self):
+        networking.app.interface = gr.Interface(
+            lambda x: x, "number", "number", examples=[[1], [-1], [3], [-2], [2]],
+            embedding=lambda x: [x, 1], examples_per_page=2, analytics_enabled=False)
+        self.client = networking.app.test_client()
+
+    def test_full_scores(self):
+        response = self.client.post("/api/score_similarity/", json={"data": [1]})
+        self.assertEqual(len(response.get_json()["data"]), 5)
+
+    def test_paged(self):
+        response = self.client.post("/api/score_similarity/", json={"data": [-1], "page": 0})
+        self.assertEqual(response.get_json()["example_ids"], [1, 3])
+        response = self.client.post("/api/score_similarity/", json={"data": [-1], "page": 2})
+        self.assertEqual(len(response.get_json()["example_ids"]), 1)
+
+
+class TestExamplesRoute(unittest.TestCase):
+    def setUp(self):
+        networking.app.interface = gr.Interface(
+            lambda x: x, "textbox", "textbox", examples=[["b"], ["c"], ["a"]], examples_per_page=2,
+            analytics_enabled=False)
+        networking.app.interface.cached_examples = {2: ["a"]}
+        self.client = networking.app.test_client()
+
+    def test_pages(self):
+        response = self.client.get("/api/examples/?page=1").get_json()
+        self.assertEqual(response["example_ids"], [2])
+        self.assertEqual(response["examples"], {"2": ["a"]})
+        self.assertEqual(response["outputs"], {"2": ["a"]})
+
+    def test_sort(self):
+        response = self.client.get("/api/examples/?page=0&sort=0").get_json()
+        self.assertEqual(response["example_ids"], [2, 0])
+        response = self.client.post("/api/examples/", json={"page": 0, "sort": 0, "descending": True}).get_json()
+        self.assertEqual(response["example_ids"], [1, 0])
+
+
+class TestViewEmbeddings(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+        def embedding(x):
+            self.calls.append(x)
+            return [x, 2 * x, 1]
+
+        networking.app.interface = gr.Interface(
+            lambda x: x, "number", "number", examples=[[1], [-1], [3]], embedding=embedding,
+            analytics_enabled=False)
+        self.client = networking.app.test_client()
+
+    def test_projection_is_cached(self):
+        response = self.client.post("/api/view_embeddings/", json={"data": [2]}).get_json()
+        self.assertEqual(len(response["example_embeddings_2d"]), 3)
+        sample = response["sample_embedding_2d"]
+        response = self.client.post("/api/update_embeddings/", json={"data": [2]}).get_json()
+        self.assertEqual(response["sample_embedding_2d"], sample)
+        self.client.post("/api/view_embeddings/", json={"data": [0]})
+        self.assertEqual(len(self.calls), 6)  # Examples are embedded once, then only the samples.
+
+
+class TestThumbnailRoute(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        gr.processing_utils.decode_base64_to_image(gr.test_data.BASE64_IMAGE).resize((1000, 800)).save(
+            os.path.join(self.tmpdir.name, "image.png"))
+        scipy.io.wavfile.write(os.path.join(self.tmpdir.name, "audio.wav"), 8000,
+                               np.sin(np.linspace(0, 1000, 80000)).astype(np.float32))
+        with open(os.path.join(self.tmpdir.name, "text.txt"), "w") as f:
+            f.write("text")
+        networking.app.cwd = self.tmpdir.name
+        networking.app.thumbnail_dir = os.path.join(self.tmpdir.name, "thumbnails")
+        networking.app.interface = gr.Interface(
+            lambda x: x, "image", "image", examples=[["image.png"]], analytics_enabled=False)
+        networking.app.example_files = networking.get_example_files(networking.app.interface)
+        self.client = networking.app.test_client()
+
+    def tearDown(self):
+        networking.app.thumbnail_dir = None
+        self.tmpdir.cleanup()
+
+    def test_image_thumbnail(self):
+        response = self.client.get("/thumbnail/image.png")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("no-cache", response.headers["Cache-Control"])
+        self.assertLessEqual(max(Image.open(BytesIO(response.data)).size), 200)
+        self.assertEqual(len(os.listdir(networking.app.thumbnail_dir)), 1)
+        etag = response.headers["ETag"]
+        self.assertEqual(self.client.get("/thumbnail/image.png", headers={"If-None-Match": etag}).status_code, 304)
+        self.assertEqual(len(os.listdir(networking.app.thumbnail_dir)), 1)
+        os.utime(os.path.join(self.tmpdir.name, "image.png"), (0, 0))  # As if the image had been edited.
+        self.assertEqual(self.client.get("/thumbnail/image.png", headers={"If-None-Match": etag}).status_code, 200)
+
+    def test_waveform_preview(self):
+        response = self.client.get("/thumbnail/audio.wav")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Image.open(BytesIO(response.data)).size, (200, 60))
+
+    def test_unsupported(self):
+        self.assertEqual(self.client.get("/thumbnail/text.txt").status_code, 404)
+        self.assertEqual(self.client.get("/thumbnail/missing.png").status_code, 404)
+        self.assertEqual(self.client.get("/thumbnail/../image.png").status_code, 404)
+
+
+class TestRateLimits(unittest.TestCase):
+    def setUp(self):
+        networking.app.interface = gr.Interface(lambda x: x[::-1], "textbox", "textbox", analytics_enabled=False)
+        networking.app.rate_limiter = RateLimiter({"predict": (0.01, 1)})
+
+    def tearDown(self):
+        networking.app.rate_limiter = None
+
+    def test_too_many_requests(self):
+        client = Client(networking.app, networking.app.response_class)  # Unlike app.test_client(), sets the address.
+
+        def predict(address, headers=None):
+            return client.post("/api/predict/", json={"data": ["abc"]}, headers=headers,
+                               environ_base={"REMOTE_ADDR": address})
+
+        self.assertEqual(predict("10.0.0.1").json["data"], ["cba"])
+        response = predict("10.0.0.1")
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response.headers)
+        # Clients are told apart by address, not by anything they send.
+        self.assertEqual(predict("10.0.0.1", headers={"Cookie": "session=new"}).status_code, 429)
+        self.assertEqual(predict("10.0.0.2").status_code, 200)
+
+
+class TestInterpretStream(unittest.TestCase):
+    def setUp(self):
+        score = lambda text, number: len(text.split(" ")) + number
+        networking.app.interface = gr.Interface(score, ["textbox", "number"], "number", interpretation="shapley",
+                                                analytics_enabled=False)
+        networking.app.scheduler = FairScheduler(max_concurrent=1)
+        self.client = networking.app.test_client()
+
+    def tearDown(self):
+        networking.app.scheduler = None
+
+    def test_stream(self):
+        response = self.client.post("/api/interpret/stream/", json={"data": ["a b c", 3]})
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        messages = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        response.close()  # Releases the scheduler slot, as the server does once the response is sent.
+        self.assertGreater(len(messages), 1)
+        self.assertIsNone(messages[0]["interpretation_scores"][1])  # The number is interpreted after the text.
+        complete = self.client.post("/api/interpret/", json={"data": ["a b c", 3]}).json
+        self.assertEqual(messages[-1]["interpretation_scores"], complete["interpretation_scores"])
+        self.assertEqual(networking.app.scheduler.active, 0)
+
+    def test_alternative_outputs(self):
+        response = self.client.post("/api/interpret/", json={"data": ["a b c", 3]}).json
+        self.assertNotIn("alternative_outputs", response)
+        request = {"id": response["alternative_outputs_id"], "input_index": 0, "neighbor_index": 1}
+        self.assertEqual(self.client.post("/api/alternative_output/", json=request).json["data"], [5])  # "a c"
+        request["neighbor_index"] = 10
+        self.assertEqual(self.client.post("/api/alternative_output/", json=request).status_code, 404)
+        request["neighbor_index"] = -1
+        self.assertEqual(self.client.post("/api/alternative_output/", json=request).status_code, 404)
+        request["id"], request["neighbor_index"] = "expired", 1
+        self.assertEqual(self.client.post("/api/alternative_output/", json=request).status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,10 @@
 import unittest
 import gradio as gr
 import numpy as np
+import os
 import pandas as pd
+import PIL
+import skimage
 import tempfile
 
 
@@ -74,6 +77,25 @@ class TestImage(unittest.TestCase):
         iface = gr.Interface(generate_noise, ["slider", "slider"], "image")
         self.assertTrue(iface.process([10, 20])[0][0].startswith("data:image/png;base64"))
 
+    def test_encoding_options(self):
+        image = np.random.RandomState(0).rand(200, 100, 3)
+        np.testing.assert_array_equal(gr.processing_utils.image_array_to_uint8(image),
+                                      skimage.img_as_ubyte(image))
+        image_output = gr.outputs.Image(format="jpeg", quality=50, max_dimension=50)
+        y_img = image_output.postprocess(image)
+        self.assertTrue(y_img.startswith("data:image/jpeg;base64,"))
+        self.assertEqual(gr.processing_utils.decode_base64_to_image(y_img).size, (25, 50))
+        rgba_img = PIL.Image.new("RGBA", (10, 10))
+        self.assertTrue(image_output.postprocess(rgba_img).startswith("data:image/jpeg;base64,"))
+        self.assertEqual(gr.outputs.Image(format="JPG").format, "jpeg")
+        positional_output = gr.outputs.Image("pil", False, "output image")
+        self.assertEqual((positional_output.type, positional_output.label, positional_output.format),
+                         ("pil", "output image", "png"))
+        for options in [{"format": "bmp"}, {"quality": 0}, {"quality": 50.5}, {"compress_level": 10},
+                        {"max_dimension": 0}]:
+            with self.assertRaises(ValueError):
+                gr.outputs.Image(**options)
+
 class TestKeyValues(unittest.TestCase):
     def test_in_interface(self):
         def letter_distribution(word):
@@ -158,15 +180,17 @@ class TestHTML(unittest.TestCase):
 
 class TestFile(unittest.TestCase):
     def test_as_component(self):
-        def write_file(content):
-            with open("test.txt", "w") as f:
-                f.write(content)
-            return "test.txt"
-
-        iface = gr.Interface(write_file, "text", "file")
-        self.assertDictEqual(iface.process(["hello world"])[0][0], {
-            'name': 'test.txt', 'size': 11, 'data': 'aGVsbG8gd29ybGQ='
-        })
+        with tempfile.TemporaryDirectory() as tmpdir:
+            def write_file(content):
+                path = os.path.join(tmpdir, "test.txt")
+                with open(path, "w") as f:
+                    f.write(content)
+                return path
+
+            iface = gr.Interface(write_file, "text", "file")
+            self.assertDictEqual(iface.process(["hello world"])[0][0], {
+                'name': 'test.txt', 'size': 11, 'data': 'aGVsbG8gd29ybGQ='
+            })
 
 
 class TestDataframe(unittest.TestCase):
@@ -0,0 +1,49 @@
+import unittest
+import threading
+import time
+from gradio.rate_limiting import RateLimiter, FairScheduler, RateLimitExceeded
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_burst_then_limit(self):
+        limiter = RateLimiter({"predict": (0.1, 2)})
+        limiter.check("a", "predict")
+        limiter.check("a", "predict")
+        with self.assertRaises(RateLimitExceeded) as context:
+            limiter.check("a", "predict")
+        self.assertGreater(context.exception.retry_after, 0)
+        limiter.check("b", "predict")  # Other clients have their own bucket.
+        limiter.check("a", "interpret")  # Routes without a limit are not limited.
+
+
+class TestFairScheduler(unittest.TestCase):
+    def test_round_robin_between_clients(self):
+        scheduler = FairScheduler(max_concurrent=1)
+        order = []
+
+        def run(client, name):
+            with scheduler.slot(client):
+                order.append(name)
+
+        with scheduler.slot("holder"):
+            threads = []
+            for client, name in [("a", "a1"), ("a", "a2"), ("a", "a3"), ("b", "b1")]:
+                expected_queued = scheduler.queued(client) + 1
+                thread = threading.Thread(target=run, args=(client, name))
+                thread.start()
+                threads.append(thread)
+                while scheduler.queued(client) < expected_queued:  # Wait until queued to fix the arrival order.
+                    time.sleep(0.001)
+        for thread in threads:
+            thread.join()
+        self.assertEqual(order, ["a1", "b1", "a2", "a3"])
+
+    def test_max_queued_per_client(self):
+        scheduler = FairScheduler(max_concurrent=1, max_queued_per_client=0)
+        with self.assertRaises(RateLimitExceeded):
+            with scheduler.slot("a"):
+                pass
+
+
+if __name__ == '__main__':
+    unittest.main()